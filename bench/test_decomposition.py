@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from timeit import timeit
+import unittest
+from random import randint
+from src.decomposition import GLVDecomposition, M1, M2, M3
+
+
+def division_decompose(k, r):
+    """Decomposition with the divisions by r, as before `GLVDecomposition`."""
+    b = [k*M1 // r, k*M2 // r]
+    return k - b[0]*M1 - b[1]*M3, -b[0]*M2 + b[1]*M1
+
+
+class BenchDecomposition(unittest.TestCase):
+
+    def test_bench_decompose(self):
+        """Benchmark the GLV decomposition with divisions, with fixed-point multipliers and in batch."""
+        global decomposition, scalars, r
+        r = 0x1cfb69d4ca675f520cce760202687600ff8f87007419047174fd06b52876e7e1
+        decomposition = GLVDecomposition(r, M1, M2, M3)
+        n = 10000
+        scalars = [randint(0, r) for _ in range(n)]
+        division_time = timeit("[division_decompose(k, r) for k in scalars]", globals=globals(), number=1)
+        fixed_point_time = timeit("[decomposition.decompose(k) for k in scalars]", globals=globals(), number=1)
+        batch_time = timeit("decomposition.batch_decompose(scalars)", globals=globals(), number=1)
+        print("GLV decomposition: divisions {:.2f}μs; fixed point {:.2f}μs; batch {:.2f}μs per scalar".format(
+            division_time/n*10**6, fixed_point_time/n*10**6, batch_time/n*10**6))
@@ -2,19 +2,16 @@
 from timeit import timeit
 import unittest
 from src.primitives.eddsa import EdDSA
+from src import params
+from src.field import Field
+from src.curve.edwards import Edwards
 
 
 class BenchEdDSA(unittest.TestCase):
 
     def set_up_signature(self):
-        """Creates Bandersnatch elliptic curve.
-
-        Test vectors generated using `sage sage/edwards.sage > tests/vectors/edwards.py`.
-
-        """
-        with open("tests/vectors/edwards.py", "r") as file:
-            exec(file.read(), globals())
-        return EdDSA(E)  # type: ignore
+        """Creates a signer on the memoized Bandersnatch curve of `src/params.py`."""
+        return EdDSA(params.edwards())
 
     def test_bench_sign(self):
         """Benchmark signature computation."""
@@ -36,3 +33,14 @@ class BenchEdDSA(unittest.TestCase):
             "v = user.verify(\"This is a benchmark of a signature verification\", sig)", globals=globals(), number=n_iter)
         print("Signature verification time: {:.2f}ms".format(
             verif_time/n_iter * 10**3))
+
+    def test_bench_startup(self):
+        """Benchmark the creation of the curve, from scratch and with the parameter registry."""
+        n_iter = 200
+        scratch_time = timeit("F = Field(params.P); E = Edwards(F(params.EDWARDS_A), F(params.EDWARDS_D), params.R, params.H)",
+                              globals=globals(), number=n_iter)
+        constants_time = timeit("F = Field(params.P, two_adicity=params.TWO_ADICITY, non_square=params.NON_SQUARE)",
+                                globals=globals(), number=n_iter)
+        registry_time = timeit("E = params.edwards()", globals=globals(), number=n_iter)
+        print("Curve creation time: from scratch {:.2f}μs; field with precomputed constants {:.2f}μs; registry {:.2f}μs".format(
+            scratch_time/n_iter * 10**6, constants_time/n_iter * 10**6, registry_time/n_iter * 10**6))
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
-from timeit import timeit
+from timeit import timeit, repeat
+import tracemalloc
 import unittest
+from src.curve.edwards import Edwards
+from src.recoding import joint_wnaf, weight
+from random import randint
 
 
 class BenchEdwards(unittest.TestCase):
@@ -47,3 +51,269 @@ class BenchEdwards(unittest.TestCase):
 
         print("Edwards curve:\nNaive mul: {:.2f} ms; GLV: {:.2f} ms ({:.0f}% faster)".format(
             naive_mul_time/n_iter*10**3, glv_time / n_iter*10**3, (naive_mul_time-glv_time)/naive_mul_time*100))
+
+    def test_bench_lazy_reduction(self):
+        """Benchmark `dbl` and `add` with eager and lazy reduction."""
+        E, test_vectors = self.set_up_curve()
+        global p, q, p_lazy, q_lazy
+        p = test_vectors['p']
+        q = test_vectors['q']
+        E_lazy = Edwards(E.a, E.d, E.r, E.h, lazy=True)
+        p_lazy = E_lazy(p.x, p.y, p.z)
+        q_lazy = E_lazy(q.x, q.y, q.z)
+
+        n_iter = 2000
+        print("Edwards curve, lazy reduction:")
+        operations = {'dbl': ("p.dbl()", "p_lazy.dbl()"),
+                      'add': ("p.add(q)", "p_lazy.add(q_lazy)")}
+        for name, (eager, lazy) in p.reduction_counts(q).items():
+            eager_time = timeit(operations[name][0], globals=globals(), number=n_iter)
+            lazy_time = timeit(operations[name][1], globals=globals(), number=n_iter)
+            print("\t{}: {} reductions, {:.2f}μs; lazy: {} reductions, {:.2f}μs ({} reductions saved)".format(
+                name, eager, eager_time/n_iter*10**6, lazy, lazy_time/n_iter*10**6, eager-lazy))
+
+    def test_bench_extended(self):
+        """Benchmark the scalar multiplications in extended and projective coordinates."""
+        E, test_vectors = self.set_up_curve()
+        global k, p, q, p_projective, q_projective
+        k = test_vectors['k']
+        p = test_vectors['p']
+        q = test_vectors['q']
+        E_projective = Edwards(E.a, E.d, E.r, E.h, extended=False)
+        p_projective = E_projective(p.x, p.y, p.z)
+        q_projective = E_projective(q.x, q.y, q.z)
+
+        n_iter = 20
+        print("Edwards curve, extended coordinates:")
+        operations = {'glv': ("p.glv(k)", "p_projective.glv(k)"),
+                      'naive_mul': ("p.naive_mul(k)", "p_projective.naive_mul(k)"),
+                      'multi_scalar_mul_2': ("p.multi_scalar_mul_2(k, q, k)",
+                                             "p_projective.multi_scalar_mul_2(k, q_projective, k)")}
+        for name, (extended, projective) in operations.items():
+            extended_time = min(repeat(extended, globals=globals(), number=n_iter, repeat=3))
+            projective_time = min(repeat(projective, globals=globals(), number=n_iter, repeat=3))
+            print("\t{}: projective {:.2f}ms; extended {:.2f}ms ({:.2f} times the time of projective)".format(
+                name, projective_time/n_iter*10**3, extended_time/n_iter*10**3, extended_time/projective_time))
+
+    def test_bench_random_batch(self):
+        """Benchmark random points, one at a time and in batch."""
+        E, test_vectors = self.set_up_curve()
+        global curve
+        curve = E
+        n = 200
+        naive_time = timeit("[curve.random() for _ in range({})]".format(n), globals=globals(), number=1)
+        batch_time = timeit("curve.random_batch({})".format(n), globals=globals(), number=1)
+        print("Edwards curve, {} random points: naive {:.2f}μs; batch {:.2f}μs per point ({:.0f}% faster)".format(
+            n, naive_time/n*10**6, batch_time/n*10**6, (naive_time-batch_time)/naive_time*100))
+
+    def test_bench_encode_array(self):
+        """Benchmark the encoding of points, one at a time and into a single buffer."""
+        E, test_vectors = self.set_up_curve()
+        global curve, points, data
+        curve = E
+        n = 1000
+        points = [p.dbl() for p in E.random_batch(n, seed=0)]
+        data = E.encode_array(points, 256)
+        naive_time = timeit("b''.join(p.encode_base(256) for p in points)", globals=globals(), number=1)
+        array_time = timeit("curve.encode_array(points, 256)", globals=globals(), number=1)
+        decode_naive_time = timeit("[curve.decode_base(data[i:i+32], 256) for i in range(0, len(data), 32)]",
+                                   globals=globals(), number=1)
+        decode_array_time = timeit("curve.decode_array(data, 256)", globals=globals(), number=1)
+        print("Edwards curve, {} points: encode naive {:.2f}μs, array {:.2f}μs; decode naive {:.2f}μs, batch {:.2f}μs per point".format(
+            n, naive_time/n*10**6, array_time/n*10**6, decode_naive_time/n*10**6, decode_array_time/n*10**6))
+
+    def test_bench_fixed_base_mul(self):
+        """Benchmark the multiplication of the generator with precomputed tables and with GLV."""
+        E, test_vectors = self.set_up_curve()
+        global curve, k
+        curve = E
+        k = test_vectors['k']
+        table_time = timeit("curve.fixed_base_mul(k)", globals=globals(), number=1)
+        n_iter = 50
+        glv_time = timeit("curve.generator.glv(k)", globals=globals(), number=n_iter)
+        fixed_base_time = timeit("curve.fixed_base_mul(k)", globals=globals(), number=n_iter)
+        print("Edwards curve, generator multiplication: GLV {:.2f}ms; fixed base {:.2f}ms ({:.0f}% faster, tables built in {:.2f}ms)".format(
+            glv_time/n_iter*10**3, fixed_base_time/n_iter*10**3, (glv_time-fixed_base_time)/glv_time*100, table_time*10**3))
+
+    def test_bench_wnaf(self):
+        """Benchmark GLV for each wNAF width, against the joint binary double-and-add."""
+        E, test_vectors = self.set_up_curve()
+        global k, p, s0, s1
+        k = test_vectors['k']
+        p = test_vectors['p']
+        s0, s1 = E.decomposition.decompose(k)
+
+        n_iter = 30
+        binary_additions = sum(1 for i in range(max(abs(s0), abs(s1)).bit_length())
+                               if (abs(s0) >> i) & 1 or (abs(s1) >> i) & 1)
+        binary_time = timeit("E._multi_scalar_mul([p, p.φ()], [s0, s1])", globals=globals(), number=n_iter)
+        print("Edwards curve, GLV with wNAF:")
+        print("\tbinary: {} additions, {:.2f}ms".format(binary_additions, binary_time/n_iter*10**3))
+        for width in range(2, 8):
+            additions = sum(weight(column) for column in joint_wnaf([s0, s1], width))
+            wnaf_time = timeit("p.glv(k, {})".format(width), globals=globals(), number=n_iter)
+            print("\twidth {}: {} additions ({:.0f}% fewer), {:.2f}ms ({:.0f}% faster)".format(
+                width, additions, (binary_additions-additions)/binary_additions*100,
+                wnaf_time/n_iter*10**3, (binary_time-wnaf_time)/binary_time*100))
+
+    def test_bench_msm(self):
+        """Benchmark Pippenger multi-scalar multiplication against a loop of GLV multiplications."""
+        E, test_vectors = self.set_up_curve()
+        global curve, points, scalars
+        curve = E
+        print("Edwards curve, multi-scalar multiplication:")
+        for n in [16, 128, 512]:
+            points = [E.fixed_base_mul(randint(1, E.r)) for _ in range(n)]
+            scalars = [randint(1, E.r) for _ in range(n)]
+            glv_time = min(repeat("[p.glv(k) for p, k in zip(points, scalars)]", globals=globals(), number=1, repeat=3))
+            msm_time = min(repeat("curve.msm(points, scalars)", globals=globals(), number=1, repeat=3))
+            endomorphism_time = min(repeat("curve.msm(points, scalars, endomorphism=True)", globals=globals(), number=1,
+                                           repeat=3))
+            print("\t{} points (window {}): GLV loop {:.2f}ms; Pippenger {:.2f}ms; with φ {:.2f}ms ({:.1f}x faster)".format(
+                n, E.msm_window(n), glv_time*10**3, msm_time*10**3, endomorphism_time*10**3,
+                glv_time/min(msm_time, endomorphism_time)))
+            self.assertLess(min(msm_time, endomorphism_time), glv_time)
+
+    def test_bench_straus(self):
+        """Benchmark the interleaved windows of `multi_scalar_mul_4` against the joint binary table.
+
+        The timings are noisy: the number of modular multiplications is counted with lazy reduction.
+
+        """
+        E, test_vectors = self.set_up_curve()
+        global curve, g, p, q, k, l, points, scalars
+        E_lazy = Edwards(E.a, E.d, E.r, E.h, lazy=True)
+        curve, g = E_lazy, E_lazy.generator
+        p = E_lazy(test_vectors['p'].x, test_vectors['p'].y, test_vectors['p'].z)
+        q = E_lazy(test_vectors['q'].x, test_vectors['q'].y, test_vectors['q'].z)
+        k, l = randint(0, E.r), randint(0, E.r)
+        points = [p, p.φ(), q, q.φ()]
+        scalars = list(E.decomposition.decompose(k) + E.decomposition.decompose(l))
+
+        def measure(statement, n_iter=10):
+            start = E_lazy.field.reductions
+            exec(statement, globals())
+            multiplications = E_lazy.field.reductions - start
+            return multiplications, min(repeat(statement, globals=globals(), number=n_iter, repeat=5))/n_iter
+
+        print("Edwards curve, multi_scalar_mul_4:")
+        joint_mul, joint_time = measure("curve._multi_scalar_mul(points, scalars)")
+        print("\tjoint binary table: {} multiplications, {:.2f}ms".format(joint_mul, joint_time*10**3))
+        for width in range(3, 7):
+            straus_mul, straus_time = measure(
+                "p.multi_scalar_mul_4(scalars[0], points[1], scalars[1], q, scalars[2], points[3], scalars[3], {})".format(width))
+            print("\twidth {}: {} multiplications ({:.0f}% fewer), {:.2f}ms".format(
+                width, straus_mul, (joint_mul-straus_mul)/joint_mul*100, straus_time*10**3))
+        g.multi_scalar_mul_2(k, q, l)
+        joint_mul, joint_time = measure("curve._multi_scalar_mul([g, g.φ(), q, q.φ()], scalars)")
+        generator_mul, generator_time = measure("g.multi_scalar_mul_2(k, q, l)")
+        print("\tverification k*G + l*Q: joint binary table {} multiplications, {:.2f}ms; "
+              "cached generator tables {} multiplications ({:.0f}% fewer), {:.2f}ms".format(
+                  joint_mul, joint_time*10**3, generator_mul, (joint_mul-generator_mul)/joint_mul*100,
+                  generator_time*10**3))
+
+    def test_bench_batch_encode(self):
+        """Benchmark normalization and encoding, point by point and in batch."""
+        E, test_vectors = self.set_up_curve()
+        global curve, points
+        curve = E
+        n = 1000
+        points = [p.dbl() for p in E.random_batch(n, seed=0)]
+        normalize_time = timeit("[p.normalize() for p in points]", globals=globals(), number=1)
+        batch_normalize_time = timeit("curve.batch_normalize(points)", globals=globals(), number=1)
+        encode_time = timeit("[p.encode_base(256) for p in points]", globals=globals(), number=1)
+        batch_encode_time = timeit("curve.batch_encode(points, 256)", globals=globals(), number=1)
+        print("Edwards curve, {} points: normalize {:.2f}μs, batch {:.2f}μs; encode {:.2f}μs, batch {:.2f}μs per point".format(
+            n, normalize_time/n*10**6, batch_normalize_time/n*10**6, encode_time/n*10**6, batch_encode_time/n*10**6))
+
+    def test_bench_in_prime_subgroup(self):
+        """Benchmark the subgroup membership test, by multiplication by r and with the endomorphism."""
+        E, test_vectors = self.set_up_curve()
+        global curve, points
+        curve = E
+        n = 50
+        points = E.random_batch(n, seed=0)
+        naive_time = timeit("[p.is_prime_order(curve.r) for p in points]", globals=globals(), number=1)
+        endomorphism_time = timeit("[p.in_prime_subgroup() for p in points]", globals=globals(), number=1)
+        batch_time = timeit("curve.batch_in_prime_subgroup(points)", globals=globals(), number=1)
+        print("Edwards curve, subgroup membership: multiplication by r {:.2f}ms, endomorphism {:.2f}ms, batch {:.2f}ms per point".format(
+            naive_time/n*10**3, endomorphism_time/n*10**3, batch_time/n*10**3))
+
+    def test_bench_φ(self):
+        """Benchmark the endomorphism φ in projective and extended coordinates."""
+        E, test_vectors = self.set_up_curve()
+        global p, p_extended
+        p = test_vectors['p'].dbl()
+        p_extended = p.extended()
+        n_iter = 10000
+        projective_time = timeit("p.φ()", globals=globals(), number=n_iter)
+        extended_time = timeit("p_extended.φ()", globals=globals(), number=n_iter)
+        print("Edwards curve, φ: projective {:.2f}μs, extended {:.2f}μs".format(
+            projective_time/n_iter*10**6, extended_time/n_iter*10**6))
+
+    def test_bench_values_kernels(self):
+        """Benchmark the scalar multiplications on residues, against the formulas on field elements (lazy curve)."""
+        E, test_vectors = self.set_up_curve()
+        global p, q, p_lazy, q_lazy, k, scalars
+        E_lazy = Edwards(E.a, E.d, E.r, E.h, lazy=True)
+        p, q = test_vectors['p'], test_vectors['q']
+        p_lazy, q_lazy = E_lazy(p.x, p.y, p.z), E_lazy(q.x, q.y, q.z)
+        k = randint(0, E.r)
+        scalars = [randint(-2**127, 2**127) for _ in range(4)]
+        n_iter = 20
+        print("Edwards curve, residues / field elements:")
+        for name, statement in [("dbl", "{p}.dbl()"), ("add", "{p}.add({q})"), ("glv", "{p}.glv(k)"),
+                                ("multi_scalar_mul_4", "{p}.multi_scalar_mul_4(scalars[0], {p}, scalars[1], {q}, "
+                                                       "scalars[2], {q}, scalars[3])")]:
+            values_time = min(repeat(statement.format(p="p", q="q"), globals=globals(), number=n_iter, repeat=5))
+            elements_time = min(repeat(statement.format(p="p_lazy", q="q_lazy"), globals=globals(), number=n_iter,
+                                       repeat=5))
+            print("\t{}: {:.2f}μs / {:.2f}μs ({:.0f}% faster)".format(
+                name, values_time/n_iter*10**6, elements_time/n_iter*10**6, (elements_time-values_time)/elements_time*100))
+
+    def test_bench_point_batch(self):
+        """Benchmark the memory and the operations of `PointBatch` against lists of points."""
+        E, test_vectors = self.set_up_curve()
+        global points, others, batch, other
+        n = 2000
+        sample = E.random_batch(n, seed=0)
+        tracemalloc.start()
+        points = [E.Point(E.field._new(p.x.value + 0), E.field._new(p.y.value + 0), E.field._new(p.z.value + 0), E) for p in sample]
+        points_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        # the residues are copied, as in `points`
+        batch = E.PointBatch([p.x.value + 0 for p in sample], [p.y.value + 0 for p in sample],
+                             [p.z.value + 0 for p in sample], E)
+        batch_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        others = points[1:] + points[:1]
+        other = E.point_batch(others)
+        add_time = timeit("[p.add(q) for p, q in zip(points, others)]", globals=globals(), number=1)
+        batch_add_time = timeit("batch.add(other)", globals=globals(), number=1)
+        dbl_time = timeit("[p.dbl() for p in points]", globals=globals(), number=1)
+        batch_dbl_time = timeit("batch.dbl()", globals=globals(), number=1)
+        print("Edwards curve, {} points: memory {:.0f} bytes per point, PointBatch {:.0f} bytes; "
+              "add {:.2f}μs, batch {:.2f}μs; dbl {:.2f}μs, batch {:.2f}μs per point".format(
+                  n, points_memory/n, batch_memory/n, add_time/n*10**6, batch_add_time/n*10**6,
+                  dbl_time/n*10**6, batch_dbl_time/n*10**6))
+
+    def test_bench_ladder_mul(self):
+        """Benchmark the Montgomery ladder with y-coordinate recovery against GLV, and the batch maps."""
+        E, test_vectors = self.set_up_curve()
+        global p, k, points
+        p = test_vectors['p']
+        k = randint(0, E.r)
+        p.ladder_mul(k)  # Montgomery model
+        n_iter = 50
+        glv_time = min(repeat("p.glv(k)", globals=globals(), number=n_iter, repeat=5))
+        ladder_time = min(repeat("p.ladder_mul(k)", globals=globals(), number=n_iter, repeat=5))
+        # the ladder runs a fixed sequence of operations, the wNAF of GLV depends on k
+        print("Edwards curve: glv {:.2f}ms, ladder_mul {:.2f}ms ({:.2f} times the time of glv)".format(
+            glv_time/n_iter*10**3, ladder_time/n_iter*10**3, ladder_time/glv_time))
+        n = 1000
+        points = E.random_batch(n, seed=0)
+        single_time = timeit("[q.to_montgomery().normalize() for q in points]", globals=globals(), number=1)
+        batch_time = timeit("E.batch_to_montgomery(points)", globals=globals(), number=1)
+        print("Edwards to Montgomery, {} affine points: {:.2f}μs, batch {:.2f}μs per point".format(
+            n, single_time/n*10**6, batch_time/n*10**6))
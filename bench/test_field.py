@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from src.field import Field
+from src.backend import BACKENDS
 import unittest
+import tracemalloc
 from timeit import timeit
 
 
@@ -36,6 +38,135 @@ class BenchField(unittest.TestCase):
         print("\tAdd: {:.3f}μs".format(naive_add_time/n_iter * 10**6))
         print("\tDiv: {:.3f}μs".format(naive_div_time/n_iter * 10**6))
 
+    def test_bench_element_overhead(self):
+        """Benchmark the trusted constructor and the memory used per element."""
+        F, test_vectors = self.set_up_field()
+        global value
+        value = test_vectors['a'].value
+        n_iter = 2000
+        checked_time = timeit("tmp=F.Element(value, F)",
+                              globals=globals(), number=n_iter)
+        trusted_time = timeit("tmp=F._new(value)",
+                              globals=globals(), number=n_iter)
+
+        class DictElement:
+            """Element layout with a per-instance `__dict__`, as before `__slots__`."""
+
+            def __init__(self, value, field):
+                self.value = value
+                self.field = field
+
+        def allocated(constructor, n=10000):
+            tracemalloc.start()
+            elements = [constructor(value, F) for _ in range(n)]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return size / len(elements)
+
+        dict_size = allocated(DictElement)
+        slots_size = allocated(F.Element)
+
+        print("Finite field element:")
+        print("\tChecked constructor: {:.3f}μs; trusted constructor: {:.3f}μs ({:.0f}% faster)".format(
+            checked_time/n_iter * 10**6, trusted_time/n_iter * 10**6, (checked_time-trusted_time)/checked_time*100))
+        print("\tMemory per element: {:.0f}B with `__dict__`, {:.0f}B with `__slots__` ({:.0f}% smaller)".format(
+            dict_size, slots_size, (dict_size-slots_size)/dict_size*100))
+
+    def test_bench_batch_invert(self):
+        """Benchmark batch inversion against element-wise inversion."""
+        F, test_vectors = self.set_up_field()
+        global elements
+        elements = [F.random() for _ in range(1000)]
+        n_iter = 10
+        naive_time = timeit("tmp=[F(1)/e for e in elements]",
+                            globals=globals(), number=n_iter)
+        batch_time = timeit("tmp=F.batch_invert(elements)",
+                            globals=globals(), number=n_iter)
+        print("Inversion of {} elements: naive {:.2f}ms; batch {:.2f}ms ({:.0f}% faster)".format(
+            len(elements), naive_time/n_iter * 10**3, batch_time/n_iter * 10**3, (naive_time-batch_time)/naive_time*100))
+
+    def test_bench_sqrt(self):
+        """Benchmark square roots, with and without a division."""
+        F, test_vectors = self.set_up_field()
+        n_iter = 200
+        sqrt_time = timeit(
+            "tmp=test_vectors['b'].sqrt()", globals=globals(), number=n_iter)
+        div_sqrt_time = timeit(
+            "tmp=(test_vectors['b']/test_vectors['a']).sqrt()", globals=globals(), number=n_iter)
+        sqrt_ratio_time = timeit(
+            "tmp=F.sqrt_ratio(test_vectors['b'], test_vectors['a'])", globals=globals(), number=n_iter)
+        print("Square root: {:.2f}μs".format(sqrt_time/n_iter * 10**6))
+        print("Square root of a ratio: division then sqrt {:.2f}μs; sqrt_ratio {:.2f}μs".format(
+            div_sqrt_time/n_iter * 10**6, sqrt_ratio_time/n_iter * 10**6))
+
+    def test_bench_is_square(self):
+        """Benchmark the Legendre symbol."""
+        F, test_vectors = self.set_up_field()
+        global elements
+        elements = [F.random() for _ in range(1000)]
+        n_iter = 10
+        euler_time = timeit("tmp=[e**((F.p-1) >> 1) == 1 for e in elements]",
+                            globals=globals(), number=n_iter)
+        jacobi_time = timeit("tmp=F.batch_is_square(elements)",
+                             globals=globals(), number=n_iter)
+        print("Legendre symbol: Euler's criterion {:.2f}μs; Jacobi symbol {:.2f}μs ({:.0f}% faster)".format(
+            euler_time/n_iter/len(elements) * 10**6, jacobi_time/n_iter/len(elements) * 10**6, (euler_time-jacobi_time)/euler_time*100))
+
+    def test_bench_vector(self):
+        """Benchmark elementwise arithmetic of vectors against loops over elements."""
+        F, test_vectors = self.set_up_field()
+        global u, v, elements_u, elements_v
+        elements_u = [F.random() for _ in range(1000)]
+        elements_v = [F.random() for _ in range(1000)]
+        u = F.vector(elements_u)
+        v = F.vector(elements_v)
+        n_iter = 20
+        print("Vector of {} elements:".format(len(u)))
+        for op in ["+", "*"]:
+            naive_time = timeit("tmp=[a{}b for a, b in zip(elements_u, elements_v)]".format(op),
+                                globals=globals(), number=n_iter)
+            vector_time = timeit("tmp=u{}v".format(op),
+                                 globals=globals(), number=n_iter)
+            print("\t{} elements {:.3f}ms; vector {:.3f}ms ({:.0f}% faster)".format(
+                op, naive_time/n_iter * 10**3, vector_time/n_iter * 10**3, (naive_time-vector_time)/naive_time*100))
+
+    def bench_backend(self, name):
+        """Benchmark the arithmetic and a Montgomery ladder step of the backend `name`."""
+        if name not in BACKENDS:
+            raise unittest.SkipTest("Backend {} is not available".format(name))
+        F, test_vectors = self.set_up_field()
+        global G, a, b, acc, backend, x1
+        G = Field(F.p, backend=name)
+        backend = G.backend
+        a = G(test_vectors['a'].value)
+        b = G(test_vectors['b'].value)
+        acc = backend.accumulators([a.value, b.value, b.value, a.value])
+        x1 = a.value
+        n_iter = 2000
+        mul_time = timeit("tmp=a*b", globals=globals(), number=n_iter)
+        add_time = timeit("tmp=a+b", globals=globals(), number=n_iter)
+        div_time = timeit("tmp=a/b", globals=globals(), number=n_iter)
+        sqrt_time = timeit("tmp=b.sqrt()", globals=globals(), number=n_iter//10)*10
+        ladder_time = timeit("backend.ladder_step(acc, x1, b.value, G.p)", globals=globals(), number=n_iter)
+        print("Backend {}:".format(name))
+        print("\tMul: {:.3f}μs".format(mul_time/n_iter * 10**6))
+        print("\tAdd: {:.3f}μs".format(add_time/n_iter * 10**6))
+        print("\tDiv: {:.3f}μs".format(div_time/n_iter * 10**6))
+        print("\tSqrt: {:.3f}μs".format(sqrt_time/n_iter * 10**6))
+        print("\tLadder step: {:.3f}μs".format(ladder_time/n_iter * 10**6))
+
+    def test_bench_backend_gmpy2(self):
+        """Benchmark the gmpy2 (mpz) backend."""
+        self.bench_backend("gmpy2")
+
+    def test_bench_backend_int(self):
+        """Benchmark the Python integers backend."""
+        self.bench_backend("int")
+
+    def test_bench_backend_xmpz(self):
+        """Benchmark the gmpy2 backend with in place (xmpz) ladder accumulators."""
+        self.bench_backend("xmpz")
+
     # def test_bench_larger_field(self):
     #     for p in [
     #         0x949e517f4288a3f1d5402b6230b5aa3c4799c8c4fdf7bad1310b0150620a3d4681a3eed1de7f8b664d7f63dbe27a32944b3620b0a9a7842d8687ae2d4825c3f5,
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
-from timeit import timeit
+from timeit import timeit, repeat
+from random import randint
+import statistics
+import tracemalloc
 import unittest
+from src.curve.montgomery import Montgomery
+from src import params
+from src.backend import BACKENDS
 
 
 class BenchMontgomery(unittest.TestCase):
@@ -27,5 +33,123 @@ class BenchMontgomery(unittest.TestCase):
         glv_time = timeit("test_vectors['k']*test_vectors['p']",
                           globals=globals(), number=n_iter)
 
-        print("Montgomery curve\nNaive mul: {:.2f} ms; GLV: {:.2f} ms ({:.0f}% faster)".format(
-            naive_mul_time/n_iter*10**3, glv_time / n_iter*10**3, (naive_mul_time-glv_time)/naive_mul_time*100))
+        print("Montgomery curve\nNaive mul: {:.2f} ms; GLV: {:.2f} ms ({:.2f} times the time of naive mul)".format(
+            naive_mul_time/n_iter*10**3, glv_time / n_iter*10**3, glv_time/naive_mul_time))
+
+    def test_bench_lazy_reduction(self):
+        """Benchmark `dbl` and `add` with eager and lazy reduction."""
+        E, test_vectors = self.set_up_curve()
+        global p, q, p_minus_q, p_lazy, q_lazy, p_minus_q_lazy
+        p = test_vectors['p']
+        q = test_vectors['q']
+        p_minus_q = test_vectors['p_minus_q']
+        E_lazy = Montgomery(E.a, E.b, E.r, E.h, lazy=True)
+        p_lazy = E_lazy(p.x, p.z)
+        q_lazy = E_lazy(q.x, q.z)
+        p_minus_q_lazy = E_lazy(p_minus_q.x, p_minus_q.z)
+
+        n_iter = 2000
+        print("Montgomery curve, lazy reduction:")
+        operations = {'dbl': ("p.dbl()", "p_lazy.dbl()"),
+                      'add': ("p.add(q, p_minus_q)", "p_lazy.add(q_lazy, p_minus_q_lazy)")}
+        for name, (eager, lazy) in p.reduction_counts(q, p_minus_q).items():
+            eager_time = timeit(operations[name][0], globals=globals(), number=n_iter)
+            lazy_time = timeit(operations[name][1], globals=globals(), number=n_iter)
+            print("\t{}: {} reductions, {:.2f}μs; lazy: {} reductions, {:.2f}μs ({} reductions saved)".format(
+                name, eager, eager_time/n_iter*10**6, lazy, lazy_time/n_iter*10**6, eager-lazy))
+
+    def test_bench_random_batch(self):
+        """Benchmark random points, one at a time and in batch."""
+        E, test_vectors = self.set_up_curve()
+        global curve
+        curve = E
+        n = 200
+        naive_time = timeit("[curve.random() for _ in range({})]".format(n), globals=globals(), number=1)
+        batch_time = timeit("curve.random_batch({})".format(n), globals=globals(), number=1)
+        print("Montgomery curve, {} random points: naive {:.2f}μs; batch {:.2f}μs per point ({:.0f}% faster)".format(
+            n, naive_time/n*10**6, batch_time/n*10**6, (naive_time-batch_time)/naive_time*100))
+
+    def test_bench_fixed_base_mul(self):
+        """Benchmark the multiplication of the generator with precomputed tables and with GLV."""
+        E, test_vectors = self.set_up_curve()
+        global curve, k
+        curve = E
+        k = test_vectors['k']
+        table_time = timeit("curve.fixed_base_mul(k)", globals=globals(), number=1)
+        n_iter = 50
+        glv_time = timeit("curve.generator.glv(k)", globals=globals(), number=n_iter)
+        fixed_base_time = timeit("curve.fixed_base_mul(k)", globals=globals(), number=n_iter)
+        print("Montgomery curve, generator multiplication: GLV {:.2f}ms; fixed base {:.2f}ms ({:.0f}% faster, tables built in {:.2f}ms)".format(
+            glv_time/n_iter*10**3, fixed_base_time/n_iter*10**3, (glv_time-fixed_base_time)/glv_time*100, table_time*10**3))
+
+    def test_bench_in_prime_subgroup(self):
+        """Benchmark the subgroup membership test, by multiplication by r and with the endomorphism."""
+        E, test_vectors = self.set_up_curve()
+        global curve, points
+        curve = E
+        n = 50
+        points = E.random_batch(n, seed=0)
+        naive_time = timeit("[p.is_prime_order(curve.r) for p in points]", globals=globals(), number=1)
+        endomorphism_time = timeit("[p.in_prime_subgroup() for p in points]", globals=globals(), number=1)
+        print("Montgomery curve, subgroup membership: multiplication by r {:.2f}ms, endomorphism {:.2f}ms per point".format(
+            naive_time/n*10**3, endomorphism_time/n*10**3))
+
+    def test_bench_point_batch(self):
+        """Benchmark the memory and the operations of `PointBatch` against lists of points."""
+        E, test_vectors = self.set_up_curve()
+        global points, others, batch, other
+        n = 2000
+        sample = E.random_batch(n, seed=0)
+        tracemalloc.start()
+        points = [E.Point(E.field._new(p.x.value + 0), E.field._new(p.z.value + 0), E) for p in sample]
+        points_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        # the residues are copied, as in `points`
+        batch = E.PointBatch([p.x.value + 0 for p in sample], [p.z.value + 0 for p in sample], E)
+        batch_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        others = points[1:] + points[:1]
+        other = E.point_batch(others)
+        add_time = timeit("[p.add(q, p) for p, q in zip(points, others)]", globals=globals(), number=1)
+        batch_add_time = timeit("batch.add(other, batch)", globals=globals(), number=1)
+        dbl_time = timeit("[p.dbl() for p in points]", globals=globals(), number=1)
+        batch_dbl_time = timeit("batch.dbl()", globals=globals(), number=1)
+        print("Montgomery curve, {} points: memory {:.0f} bytes per point, PointBatch {:.0f} bytes; "
+              "add {:.2f}μs, batch {:.2f}μs; dbl {:.2f}μs, batch {:.2f}μs per point".format(
+                  n, points_memory/n, batch_memory/n, add_time/n*10**6, batch_add_time/n*10**6,
+                  dbl_time/n*10**6, batch_dbl_time/n*10**6))
+
+    def test_bench_ladder(self):
+        """Benchmark the ladders on residues (`naive_mul` and the fixed-length `mul_rfc_7748`) in every backend, against GLV."""
+        E, test_vectors = self.set_up_curve()
+        global p, k
+        k = test_vectors['k']
+        n_iter = 50
+        print("Montgomery curve, scalar multiplication:")
+        for name in BACKENDS:
+            curve = params.montgomery(name)
+            p = curve(test_vectors['p'].x.value, test_vectors['p'].z.value)
+            naive_time = timeit("p.naive_mul(k)", globals=globals(), number=n_iter)
+            glv_time = timeit("p.glv(k)", globals=globals(), number=n_iter)
+            ladder_time = timeit("p.mul_rfc_7748(k)", globals=globals(), number=n_iter)
+            print("\t{}: naive mul {:.2f}ms, fixed-length ladder {:.2f}ms, GLV {:.2f}ms ({:.2f} times the time of the ladder)".format(
+                name, naive_time/n_iter*10**3, ladder_time/n_iter*10**3, glv_time/n_iter*10**3,
+                glv_time/ladder_time))
+
+    def test_bench_constant_time(self):
+        """Benchmark the timing variance of GLV with the two-dimensional ladder and with the variable-time chain."""
+        E, test_vectors = self.set_up_curve()
+        global p, k
+        p = test_vectors['p']
+        n_scalars, n_iter = 30, 5
+        print("Montgomery curve, GLV over {} random scalars:".format(n_scalars))
+        for name, statement in [("two-dimensional ladder (constant_time)", "p.glv(k, constant_time=True)"),
+                                ("variable-time chain", "p.glv(k)")]:
+            times = []
+            for _ in range(n_scalars):
+                k = randint(0, E.r)
+                times.append(min(repeat(statement, globals=globals(), number=n_iter, repeat=3))/n_iter)
+            mean = statistics.mean(times)
+            print("\t{}: mean {:.2f}ms, standard deviation {:.1f}%, range {:.1f}%".format(
+                name, mean*10**3, statistics.stdev(times)/mean*100, (max(times)-min(times))/mean*100))
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import random
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+class IntBackend:
+    """Arithmetic with Python integers, for environments without gmpy2."""
+    name = "int"
+    integer = int
+
+    @staticmethod
+    def invert(x, p):
+        """Inverse of `x` modulo `p`."""
+        if x % p == 0:
+            raise ZeroDivisionError("division by zero")
+        return pow(x, -1, p)
+
+    @staticmethod
+    def powmod(x, e, p):
+        """Modular exponentiation `x` to the power `e` modulo `p`."""
+        return pow(x, e, p)
+
+    @staticmethod
+    def jacobi(a, n):
+        """Jacobi symbol (`a`/`n`) for an odd `n` > 0.
+
+        Reference:
+        H. Cohen, A Course in Computational Algebraic Number Theory, algorithm 1.4.10.
+
+        """
+        a %= n
+        result = 1
+        while a:
+            while a & 1 == 0:
+                a >>= 1
+                if n & 7 in (3, 5):
+                    result = -result
+            a, n = n, a
+            if a & 3 == 3 and n & 3 == 3:
+                result = -result
+            a %= n
+        return result if n == 1 else 0
+
+    @staticmethod
+    def random_state(seed=None):
+        """State of the pseudo-random generator, seeded with `seed` if given."""
+        return random.Random(seed)
+
+    @staticmethod
+    def random_below(state, n):
+        """Random integer in [0, `n`) drawn from `state`."""
+        return state.randrange(n)
+
+    @staticmethod
+    def accumulators(values):
+        """Accumulators of the Montgomery ladder (X2, Z2, X3, Z3), see `ladder_step`."""
+        return list(values)
+
+    @staticmethod
+    def ladder_step(acc, x1, a24, p):
+        """Step of the Montgomery ladder: (R0, R1) ← (2R0, R0+R1) where R1-R0 has x-coordinate `x1`.
+
+        `acc` = [X2, Z2, X3, Z3] holds R0 and R1. `a24` = (A+2)/4.
+        Reference:
+        https://datatracker.ietf.org/doc/html/rfc7748 section 5.
+
+        """
+        x2, z2, x3, z3 = acc[0], acc[1], acc[2], acc[3]
+        a = x2 + z2
+        b = x2 - z2
+        c = x3 + z3
+        d = x3 - z3
+        da = d * a % p
+        cb = c * b % p
+        aa = a * a % p
+        bb = b * b % p
+        e = aa - bb
+        acc[0] = aa * bb % p
+        acc[1] = e * (bb + a24 * e) % p
+        acc[2] = (da + cb) ** 2 % p
+        acc[3] = (da - cb) ** 2 % p * x1 % p
+
+    @staticmethod
+    def cswap(acc, swap):
+        """Swap R0 = (X2, Z2) and R1 = (X3, Z3) in the accumulators `acc` if `swap` is 1, with a mask and no branch.
+
+        Reference:
+        https://datatracker.ietf.org/doc/html/rfc7748 section 5.
+
+        """
+        mask = -swap
+        t = mask & (acc[0] ^ acc[2])
+        acc[0] ^= t
+        acc[2] ^= t
+        t = mask & (acc[1] ^ acc[3])
+        acc[1] ^= t
+        acc[3] ^= t
+
+    @staticmethod
+    def values(acc):
+        """Reduced residues (X2, Z2, X3, Z3) of the accumulators `acc`."""
+        return acc[0], acc[1], acc[2], acc[3]
+
+
+class GMPBackend(IntBackend):
+    """Arithmetic with gmpy2 immutable integers (mpz)."""
+    name = "gmpy2"
+
+    def __init__(self):
+        self.integer = gmpy2.mpz
+        self.invert = gmpy2.invert
+        self.powmod = gmpy2.powmod
+        self.jacobi = gmpy2.jacobi
+
+    @staticmethod
+    def random_state(seed=None):
+        """State of the pseudo-random generator, seeded with `seed` if given."""
+        return gmpy2.random_state() if seed is None else gmpy2.random_state(seed)
+
+    @staticmethod
+    def random_below(state, n):
+        """Random integer in [0, `n`) drawn from `state`."""
+        return gmpy2.mpz_random(state, n)
+
+
+class XMPZBackend(GMPBackend):
+    """Arithmetic with gmpy2 integers, and mutable integers (xmpz) updated in place for the ladder.
+
+    The elements are still immutable mpz: only the accumulators of `ladder_step` are mutable.
+
+    """
+    name = "xmpz"
+
+    @staticmethod
+    def accumulators(values):
+        """Accumulators (X2, Z2, X3, Z3) followed by four temporaries, all mutable."""
+        return [gmpy2.xmpz(value) for value in values] + [gmpy2.xmpz(0) for _ in range(4)]
+
+    @staticmethod
+    def ladder_step(acc, x1, a24, p):
+        """In place step of the Montgomery ladder, see `IntBackend.ladder_step`.
+
+        `t ^= t` clears the accumulator `t` without allocating a new integer.
+
+        """
+        x2, z2, x3, z3, a, b, c, d = acc
+        a ^= a
+        a += x2
+        a += z2
+        b ^= b
+        b += x2
+        b -= z2
+        c ^= c
+        c += x3
+        c += z3
+        d ^= d
+        d += x3
+        d -= z3
+        d *= a  # DA
+        d %= p
+        c *= b  # CB
+        c %= p
+        a *= a  # AA
+        a %= p
+        b *= b  # BB
+        b %= p
+        x3 ^= x3
+        x3 += d
+        x3 += c
+        x3 *= x3
+        x3 %= p
+        z3 ^= z3
+        z3 += d
+        z3 -= c
+        z3 *= z3
+        z3 %= p
+        z3 *= x1
+        z3 %= p
+        x2 ^= x2
+        x2 += a
+        x2 *= b
+        x2 %= p
+        a -= b  # E
+        z2 ^= z2
+        z2 += a24
+        z2 *= a
+        z2 += b
+        z2 *= a
+        z2 %= p
+
+    @staticmethod
+    def cswap(acc, swap):
+        """In place conditional swap, see `IntBackend.cswap`: the first temporary holds the masked XOR."""
+        x2, z2, x3, z3, t = acc[0], acc[1], acc[2], acc[3], acc[4]
+        mask = -swap
+        t ^= t
+        t += x2
+        t ^= x3
+        t &= mask
+        x2 ^= t
+        x3 ^= t
+        t ^= t
+        t += z2
+        t ^= z3
+        t &= mask
+        z2 ^= t
+        z3 ^= t
+
+    @staticmethod
+    def values(acc):
+        """Reduced residues (X2, Z2, X3, Z3) of the accumulators `acc`, as immutable mpz."""
+        return gmpy2.mpz(acc[0]), gmpy2.mpz(acc[1]), gmpy2.mpz(acc[2]), gmpy2.mpz(acc[3])
+
+
+BACKENDS = {"int": IntBackend()}
+if gmpy2 is not None:
+    BACKENDS["gmpy2"] = GMPBackend()
+    BACKENDS["xmpz"] = XMPZBackend()
+
+
+def get_backend(backend=None):
+    """Backend named `backend`, or the default one: gmpy2 when it is installed, else Python integers.
+
+    A backend object is returned unchanged.
+
+    """
+    if backend is None:
+        backend = "gmpy2" if gmpy2 is not None else "int"
+    if isinstance(backend, str):
+        if backend not in BACKENDS:
+            raise ValueError("Unknown or unavailable backend: {}".format(backend))
+        return BACKENDS[backend]
+    return backend
@@ -1,16 +1,221 @@
 # -*- coding: utf-8 -*-
-from math import floor
+import random
 from src.field import Field
-from gmpy2 import mpq, mpz, mod
+from src.recoding import joint_wnaf, signed_windows
+from src.decomposition import GLVDecomposition, M1, M2, M3
+
+
+def _dbl_formula(x, y, z, a):
+    """Projective doubling formula of https://eprint.iacr.org/2008/013.pdf page 12.
+
+    The coordinates are `Field.Element` or `Field.Lazy` objects.
+
+    """
+    b = (x+y)**2
+    c = x**2
+    d = y**2
+    e = a * c
+    f = e + d
+    h = z**2
+    j = f-2*h
+    x_r = (b-c-d)*j
+    y_r = f * (e-d)
+    z_r = f*j
+    return x_r, y_r, z_r
+
+
+def _add_formula(x_p, y_p, z_p, x_q, y_q, z_q, a, d):
+    """Projective addition formula of https://eprint.iacr.org/2008/013.pdf page 12.
+
+    The coordinates are `Field.Element` or `Field.Lazy` objects.
+
+    """
+    a_ = z_p * z_q
+    b = a_**2
+    c = x_p * x_q
+    d_ = y_p * y_q
+    e = d * c * d_
+    f = b-e
+    g = b+e
+    x_r = a_*f*((x_p+y_p) * (x_q+y_q) - c - d_)
+    y_r = a_*g*(d_-a*c)
+    z_r = f*g
+    return x_r, y_r, z_r
+
+
+def _extended_dbl_formula(x, y, z, a):
+    """Extended doubling formula of https://eprint.iacr.org/2008/522.pdf section 3.3.
+
+    The input T coordinate is not used. The coordinates are `Field.Element` or `Field.Lazy` objects.
+
+    """
+    a_ = x**2
+    b = y**2
+    c = 2*z**2
+    d = a*a_
+    e = (x+y)**2-a_-b
+    g = d+b
+    f = g-c
+    h = d-b
+    return e*f, g*h, e*h, f*g
+
+
+def _extended_add_formula(x_p, y_p, t_p, z_p, x_q, y_q, t_q, z_q, a, d):
+    """Extended unified addition formula of https://eprint.iacr.org/2008/522.pdf section 3.1.
+
+    The coordinates are `Field.Element` or `Field.Lazy` objects.
+
+    """
+    a_ = x_p*x_q
+    b = y_p*y_q
+    c = d*t_p*t_q
+    d_ = z_p*z_q
+    e = (x_p+y_p)*(x_q+y_q)-a_-b
+    f = d_-c
+    g = d_+c
+    h = b-a*a_
+    return e*f, g*h, e*h, f*g
+
+
+def _extended_madd_formula(x_p, y_p, t_p, z_p, x_q, y_q, t_q, a, d):
+    """Extended mixed addition formula (Z = 1 for the second point), see `_extended_add_formula`."""
+    a_ = x_p*x_q
+    b = y_p*y_q
+    c = d*t_p*t_q
+    e = (x_p+y_p)*(x_q+y_q)-a_-b
+    f = z_p-c
+    g = z_p+c
+    h = b-a*a_
+    return e*f, g*h, e*h, f*g
+
+
+# Kernels on raw residues: the formulas above, with the reductions modulo `p` written out and no
+# `Field.Element` temporaries. `a` is the representative of the curve coefficient of smallest
+# absolute value (-5 for Bandersnatch), see `Edwards._a_small`.
+
+def _dbl_values(x, y, z, a, p):
+    """Projective doubling on residues, see `_dbl_formula`."""
+    c = x*x % p
+    d = y*y % p
+    e = a*c % p
+    f = e + d
+    j = f - 2*(z*z % p)
+    return ((x+y)**2 - c - d) % p * j % p, f*(e-d) % p, f*j % p
+
+
+def _add_values(x_p, y_p, z_p, x_q, y_q, z_q, a, d, p):
+    """Projective addition on residues, see `_add_formula`."""
+    a_ = z_p*z_q % p
+    b = a_*a_ % p
+    c = x_p*x_q % p
+    d_ = y_p*y_q % p
+    e = d*c % p * d_ % p
+    f = b - e
+    g = b + e
+    x_r = a_*f % p * (((x_p+y_p)*(x_q+y_q) - c - d_) % p) % p
+    y_r = a_*g % p * ((d_ - a*c) % p) % p
+    return x_r, y_r, f*g % p
+
+
+def _extended_dbl_values(x, y, z, a, p):
+    """Extended doubling on residues, see `_extended_dbl_formula`."""
+    a_ = x*x % p
+    b = y*y % p
+    d = a*a_
+    e = ((x+y)**2 - a_ - b) % p
+    g = (d + b) % p
+    f = g - 2*(z*z % p)
+    h = d - b
+    return e*f % p, g*h % p, e*h % p, f*g % p
+
+
+def _extended_add_values(x_p, y_p, t_p, z_p, x_q, y_q, t_q, z_q, a, d, p):
+    """Extended unified addition on residues, see `_extended_add_formula`."""
+    a_ = x_p*x_q % p
+    b = y_p*y_q % p
+    c = d*t_p % p * t_q % p
+    d_ = z_p*z_q % p
+    e = ((x_p+y_p)*(x_q+y_q) - a_ - b) % p
+    f = d_ - c
+    g = d_ + c
+    h = (b - a*a_) % p
+    return e*f % p, g*h % p, e*h % p, f*g % p
+
+
+def _extended_madd_values(x_p, y_p, t_p, z_p, x_q, y_q, dt_q, a, p):
+    """Extended mixed addition on residues, for a second point (x_q, y_q, t_q, 1) given with `dt_q` = d*t_q.
+
+    Precomputing d*t_q saves one multiplication per addition, see `_extended_madd_formula`.
+
+    """
+    a_ = x_p*x_q % p
+    b = y_p*y_q % p
+    c = t_p*dt_q % p
+    e = ((x_p+y_p)*(x_q+y_q) - a_ - b) % p
+    f = z_p - c
+    g = z_p + c
+    h = (b - a*a_) % p
+    return e*f % p, g*h % p, e*h % p, f*g % p
+
+
+def _φ_formula(x, y, z, k, ρ, σ):
+    """Projective formula of the endomorphism φ, see `Point.φ`.
+
+    With Y = y², Z = z², U = Y - ρZ, V = Y + ρZ and W = Y - σZ:
+    φ(x, y, z) = (k*x*W*U, ρ*V*yZ, yZ*U), 2 squarings, 5 multiplications and 4 by constants.
+    The coordinates are `Field.Element` or `Field.Lazy` objects.
+
+    """
+    y2 = y**2
+    z2 = z**2
+    u = y2 - ρ*z2
+    yz2 = y*z2
+    return k*x*(y2 - σ*z2)*u, ρ*(y2 + ρ*z2)*yz2, yz2*u
+
+
+def _extended_φ_formula(x, y, z, k, ρ, σ):
+    """Extended formula of the endomorphism φ, see `_φ_formula`.
+
+    The affine coordinates are kxW/(yZ) and ρV/U: with the denominator yZ*U, the result is
+    (kxW*U, ρV*yZ, kxW*ρV, yZ*U), one multiplication more than the projective formula.
+    The input T coordinate is not used.
+
+    """
+    y2 = y**2
+    z2 = z**2
+    u = y2 - ρ*z2
+    yz2 = y*z2
+    xw = k*x*(y2 - σ*z2)
+    v = ρ*(y2 + ρ*z2)
+    return xw*u, v*yz2, xw*v, yz2*u
 
 
 class Edwards:
-    def __init__(self, a, d, r, h):
+    def __init__(self, a, d, r, h, lazy=False, extended=True):
         self.field = a.field
         self.a = a
         self.d = d
         self.r = r
         self.h = h
+        # Lazy modular reduction in the formulas of `Point.dbl` and `Point.add`
+        self.lazy = lazy
+        # Scalar multiplications in extended coordinates, see `ExtendedPoint`
+        self.extended = extended
+        # Coefficient a of the raw residue kernels, as a small negative integer when it is close to p
+        self._a_small = a.value - a.field.p if a.value > a.field.p >> 1 else a.value
+        # GLV decomposition of the scalars for the endomorphism `Point.φ`
+        self.decomposition = GLVDecomposition(r, M1, M2, M3)
+        # Constants (k, ρ, σ) of the formulas of the endomorphism `Point.φ`, obtained using `sage sage/φ.sage`:
+        # ρ = sqrt(2) - 1 and σ = A + 3 where A = 2(a+d)/(a-d) is the coefficient of the Montgomery model.
+        self._φ_constants = tuple(self.field(c) for c in (
+            0x50281ac0f92fc1b29d2a646fe1f5beb21ec0cb08e81f589296d082245cf9382d,
+            0x52c9f28b828426a561f00d3a63511a882ea712770d9af4d6ee0f014d172510b4,
+            0x4247698f4e32ad45a293959b4ca17afa4a2d2317e4c6ce5023e1fd63d1b5de9b))
+        # Tables of `fixed_base_mul` and of `_generator_wnaf_tables` by window width, computed at the first use
+        self._fixed_base_tables = {}
+        self._generator_tables = {}
+        # Birationally equivalent Montgomery curve of `Point.ladder_mul`, computed at the first use
+        self._montgomery_twin = None
         self.generator = self.Point(self.field(3), self.field(
             0x2d418cc584d9c9df8750a436fac98068949d14c7bdce4034fe792e4c14e30a3f), self.field(1), self)
 
@@ -20,22 +225,420 @@ class Edwards:
     __str__ = __repr__
 
     def __call__(self, x, y, z):
-        if isinstance(x, int) or isinstance(x, mpz):
+        if not isinstance(x, Field.Element):
             x = self.field(x)
-        if isinstance(y, int) or isinstance(y, mpz):
+        if not isinstance(y, Field.Element):
             y = self.field(y)
-        if isinstance(z, int) or isinstance(z, mpz):
+        if not isinstance(z, Field.Element):
             z = self.field(z)
         return self.Point(x, y, z, self)
 
+    def _formula(self, formula, coordinates, *constants, point=None):
+        """Evaluate `formula` on `coordinates` and `constants`, with lazy reduction if `self.lazy`.
+
+        The result is a `point` object (`Point` by default).
+
+        """
+        point = point or self.Point
+        if not self.lazy:
+            return point(*formula(*coordinates, *constants), self)
+        result = formula(*[c.lazy() for c in coordinates], *constants)
+        return point(*[c.reduce() for c in result], self)
+
+    def _from_values(self, values, point=None):
+        """`point` (`Point` by default) with the reduced residues `values` as coordinates."""
+        new = self.field._new
+        return (point or self.Point)(*[new(value) for value in values], self)
+
+    def _normalized_extended(self, points):
+        """Extended coordinates with Z = 1 of `points` (`Point` or `ExtendedPoint`), sharing one inversion.
+
+        Returns None if one of the points is at infinity: it has no extended coordinates.
+
+        """
+        if any(point.z == 0 for point in points):
+            return None
+        one = self.field(1)
+        result = []
+        for point, z_inv in zip(points, self.field.batch_invert([point.z for point in points])):
+            x, y = point.x * z_inv, point.y * z_inv
+            result.append(self.ExtendedPoint(x, y, x*y, one, self))
+        return result
+
+    def _extended_identity(self):
+        """Neutral element (0:1:0:1) in extended coordinates."""
+        return self.ExtendedPoint(self.field(0), self.field(1), self.field(0), self.field(1), self)
+
+    def fixed_base_mul(self, k, window=6):
+        """Scalar multiplication `k` * `self.generator` with precomputed tables.
+
+        Signed fixed-window method: `k` mod r is recoded as ∑ d_i 2^(wi) with digits
+        -2^(w-1) < d_i ≤ 2^(w-1) (see `signed_windows`), so that k*G = ∑ d_i * (2^(wi) G)
+        is a sum of table entries without any doubling. The table is built at the first call
+        for each window width.
+        TODO not constant time.
+
+        """
+        table = self._fixed_base_tables.get(window)
+        if table is None:
+            table = self._fixed_base_tables[window] = self._fixed_base_table(window)
+        res = self._extended_identity()
+        for row, digit in zip(table, signed_windows(int(k) % self.r, window)):
+            if digit > 0:
+                res = res.madd(row[digit-1])
+            elif digit < 0:
+                res = res.madd(row[-digit-1].neg())
+        return res.projective()
+
+    def _fixed_base_table(self, window):
+        """Rows of multiples j * 2^(wi) * `self.generator` for 1 ≤ j ≤ 2^(w-1), with Z = 1."""
+        base = self._normalized_extended([self.generator])[0]
+        rows = []
+        for _ in range(self.r.bit_length() // window + 1):
+            row = [base]
+            for _ in range(2, (1 << (window-1)) + 1):
+                row.append(row[-1].add(base))
+            rows.append(row)
+            # 2^w * base
+            base = row[-1].dbl()
+        points = self._normalized_extended([point for row in rows for point in row])
+        n = 1 << (window-1)
+        return [points[i:i+n] for i in range(0, len(points), n)]
+
+    def msm(self, points, scalars, endomorphism=False):
+        """Multi-scalar multiplication ∑ `scalars[i]` * `points[i]` with Pippenger's bucket method.
+
+        The scalars are cut in signed windows of c bits (see `signed_windows`), with c growing
+        like log(N) for N points. For each window, every point is added to the bucket of its
+        digit, and the 2^(c-1) buckets are summed with running sums: about N + 2^c additions
+        per window instead of N scalar multiplications.
+        With `endomorphism`, each scalar is split in two half-scalars for P and φ(P) (see
+        `GLVDecomposition.batch_decompose`), which halves the number of windows. The points
+        must then be of order r.
+        TODO not constant time.
+        Reference:
+        N. Pippenger, On the evaluation of powers and monomials, 1980.
+
+        """
+        if len(points) != len(scalars):
+            raise ValueError("{} points for {} scalars".format(len(points), len(scalars)))
+        if endomorphism:
+            halves = self.decomposition.batch_decompose(scalars)
+            scalars = [k for half in halves for k in half]
+            points = [q for point in points for q in (point, point.φ())]
+        points = [point.neg() if int(k) < 0 else point for point, k in zip(points, scalars)]
+        scalars = [abs(int(k)) for k in scalars]
+        n_bits = max((k.bit_length() for k in scalars), default=0)
+        if n_bits == 0:
+            return self(0, 1, 1)
+
+        c = self.msm_window(len(points))
+        n_windows = n_bits // c + 1
+        digits = [signed_windows(k, c) for k in scalars]
+        digits = [d + [0] * (n_windows - len(d)) for d in digits]
+
+        if self.extended:
+            bases = self._normalized_extended(points)
+        if self.extended and bases is not None:
+            if not self.lazy:
+                return self._msm_values(bases, digits, c)
+            add, madd = self.ExtendedPoint.add, self.ExtendedPoint.madd
+        else:
+            bases = points
+            add = madd = self.Point.add
+        negations = [base.neg() for base in bases]
+
+        res = None
+        for j in range(n_windows - 1, -1, -1):
+            if res is not None:
+                for _ in range(c):
+                    res = res.dbl()
+            buckets = [None] * (1 << (c-1))
+            for base, negation, d in zip(bases, negations, digits):
+                digit = d[j]
+                if digit:
+                    q = base if digit > 0 else negation
+                    i = abs(digit) - 1
+                    buckets[i] = q if buckets[i] is None else madd(buckets[i], q)
+            # ∑ (i+1) * buckets[i] = ∑ of the running sums from the top bucket
+            running = window_sum = None
+            for bucket in reversed(buckets):
+                if bucket is not None:
+                    running = bucket if running is None else add(running, bucket)
+                if running is not None:
+                    window_sum = running if window_sum is None else add(window_sum, running)
+            if window_sum is not None:
+                res = window_sum if res is None else add(res, window_sum)
+        if res is None:
+            return self(0, 1, 1)
+        return res.projective() if bases is not points else res
+
+    def _msm_values(self, bases, digits, c):
+        """Bucket method of `msm` on residues, for normalized `ExtendedPoint` `bases` and their `digits`.
+
+        The bases are tuples (x, y, t, d*t) added to the buckets by `_extended_madd_values`, as in
+        `_wnaf_multi_scalar_mul`: a `Point` is only built for the result.
+
+        """
+        p, a, d = self.field.p, self._a_small, self.d.value
+        entries = []
+        for base in bases:
+            x, y, t = base.x.value, base.y.value, base.t.value
+            dt = d*t % p
+            entries.append(((x, y, t, dt), (-x % p, y, -t % p, -dt % p)))
+        res = None
+        for j in range(len(digits[0]) - 1, -1, -1):
+            if res is not None:
+                for _ in range(c):
+                    res = _extended_dbl_values(res[0], res[1], res[3], a, p)
+            buckets = [None] * (1 << (c-1))
+            for (base, negation), digit in zip(entries, (dd[j] for dd in digits)):
+                if digit:
+                    q = base if digit > 0 else negation
+                    i = abs(digit) - 1
+                    b = buckets[i]
+                    if b is None:
+                        buckets[i] = (q[0], q[1], q[2], 1)
+                    else:
+                        buckets[i] = _extended_madd_values(b[0], b[1], b[2], b[3], q[0], q[1], q[3], a, p)
+            # ∑ (i+1) * buckets[i] = ∑ of the running sums from the top bucket
+            running = window_sum = None
+            for bucket in reversed(buckets):
+                if bucket is not None:
+                    running = bucket if running is None else _extended_add_values(*running, *bucket, a, d, p)
+                if running is not None:
+                    window_sum = running if window_sum is None else _extended_add_values(*window_sum, *running, a, d, p)
+            if window_sum is not None:
+                res = window_sum if res is None else _extended_add_values(*res, *window_sum, a, d, p)
+        if res is None:
+            return self(0, 1, 1)
+        return self._from_values((res[0], res[1], res[3]))
+
+    @staticmethod
+    def msm_window(n):
+        """Window width of `msm` for `n` points, log2(n)/2 + 2 bits (tuned with `bench/test_edwards.py`)."""
+        return max(2, n.bit_length() // 2 + 2)
+
+    def _wnaf_tables(self, points, width):
+        """Tables of odd multiples P, 3P, ..., (2^(w-1)-1)P of `points` for `_wnaf_multi_scalar_mul`.
+
+        Each table is a pair (multiples, negations of the multiples). With `self.extended`, the
+        entries are normalized (Z = 1) with a single inversion, and they are tuples of residues
+        (x, y, t, d*t) for `_extended_madd_values` unless `self.lazy`.
+
+        """
+        if self.extended:
+            bases = self._normalized_extended(points)
+        if not self.extended or bases is None:
+            bases = points
+        elif not self.lazy:
+            return self._wnaf_tables_values(bases, width)
+        tables = []
+        for base in bases:
+            base_2 = base.dbl()
+            table = [base]
+            for _ in range((1 << (width-2)) - 1):
+                table.append(table[-1].add(base_2))
+            tables.append(table)
+        if bases is not points:
+            n = 1 << (width-2)
+            entries = self._normalized_extended([point for table in tables for point in table])
+            tables = [entries[i:i+n] for i in range(0, len(entries), n)]
+        return [(table, [point.neg() for point in table]) for table in tables]
+
+    def _wnaf_tables_values(self, bases, width):
+        """Tables of `_wnaf_tables` on residues, for normalized `ExtendedPoint` `bases`."""
+        p, a, d = self.field.p, self._a_small, self.d.value
+        n = 1 << (width-2)
+        entries = []
+        for base in bases:
+            x, y, t = base.x.value, base.y.value, base.t.value
+            x2, y2, t2, z2 = _extended_dbl_values(x, y, 1, a, p)
+            q = (x, y, t, 1)
+            entries.append(q)
+            for _ in range(n - 1):
+                q = _extended_add_values(q[0], q[1], q[2], q[3], x2, y2, t2, z2, a, d, p)
+                entries.append(q)
+        tables = []
+        for i, z_inv in enumerate(self.field._batch_invert_values([q[3] for q in entries])):
+            x, y = entries[i][0] * z_inv % p, entries[i][1] * z_inv % p
+            t = x*y % p
+            dt = d*t % p
+            if i % n == 0:
+                tables.append(([], []))
+            tables[-1][0].append((x, y, t, dt))
+            tables[-1][1].append((-x % p, y, -t % p, -dt % p))
+        return tables
+
+    def _generator_wnaf_tables(self, width=8):
+        """Tables of `_wnaf_tables` for the generator G and φ(G), computed once."""
+        if width not in self._generator_tables:
+            self._generator_tables[width] = self._wnaf_tables([self.generator, self.generator.φ()], width)
+        return self._generator_tables[width]
+
+    def _wnaf_multi_scalar_mul(self, points, scalars, width, tables=()):
+        """Sum of the `scalars[i]` * `points[i]` by interleaved wNAF, see `src/recoding.py`.
+
+        The doublings are shared, and each point has its own table of odd multiples
+        (see `_wnaf_tables`): a negative digit adds the negation of an entry. `tables` are
+        precomputed tables of the first points, of any width, for example those of
+        `_generator_wnaf_tables`: a wider table gives fewer nonzero digits.
+        TODO not constant time.
+
+        """
+        tables = list(tables)
+        new_tables = self._wnaf_tables(points[len(tables):], width)
+        if tables and new_tables and type(new_tables[0][0][0]) is not type(tables[0][0][0]):
+            # a point at infinity has no extended coordinates: all the tables are projective
+            tables = self._wnaf_tables(points, width)
+        else:
+            tables += new_tables
+        # a table of 2^(w-2) odd multiples is used with the wNAF of width w
+        widths = [len(table).bit_length() + 1 for table, _ in tables]
+        columns = reversed(joint_wnaf(scalars, widths))
+
+        if type(tables[0][0][0]) is tuple:
+            # the loop runs on residues: a `Point` is only built for the result
+            p, a = self.field.p, self._a_small
+            res = None
+            for column in columns:
+                if res is not None:
+                    res = _extended_dbl_values(res[0], res[1], res[3], a, p)
+                for (table, negations), digit in zip(tables, column):
+                    if digit:
+                        q = table[digit >> 1] if digit > 0 else negations[-digit >> 1]
+                        if res is None:
+                            res = (q[0], q[1], q[2], 1)
+                        else:
+                            res = _extended_madd_values(res[0], res[1], res[2], res[3], q[0], q[1], q[3], a, p)
+            if res is None:
+                return self(0, 1, 1)
+            return self._from_values((res[0], res[1], res[3]))
+
+        if type(tables[0][0][0]) is self.ExtendedPoint:
+            add = self.ExtendedPoint.madd
+        else:
+            add = self.Point.add
+        # the leading doublings of the neutral element are skipped
+        res = None
+        for column in columns:
+            if res is not None:
+                res = res.dbl()
+            for (table, negations), digit in zip(tables, column):
+                if digit:
+                    q = table[digit >> 1] if digit > 0 else negations[-digit >> 1]
+                    res = q if res is None else add(res, q)
+        if res is None:
+            return self(0, 1, 1)
+        return res.projective() if add is not self.Point.add else res
+
+    def _multi_scalar_mul(self, points, scalars):
+        """Sum of the `scalars[i]` * `points[i]`, by a joint double-and-add from the MSB to the LSB.
+
+        The table of the 2^n sums of subsets of `points` is built with 2^n-n-1 additions. With
+        `self.extended`, the table is computed in extended coordinates and normalized (Z = 1) with a
+        single inversion, so that the main loop uses mixed additions.
+        TODO not constant time.
+
+        """
+        points = [point.neg() if int(k) < 0 else point for point, k in zip(points, scalars)]
+        scalars = [abs(int(k)) for k in scalars]
+        if self.extended:
+            bases = self._normalized_extended(points)
+        if self.extended and bases is not None:
+            if not self.lazy:
+                return self._multi_scalar_mul_values(bases, scalars)
+            identity = self._extended_identity()
+        else:
+            bases = points
+            identity = self(0, 1, 1)
+
+        add = self.ExtendedPoint.madd if bases is not points else self.Point.add
+        # table[j] = ∑ points[i] for the bits i of j
+        table = [identity]
+        for base in bases:
+            table += [base] + [add(t, base) for t in table[1:]]
+        if bases is not points:
+            table = [identity] + self._normalized_extended(table[1:])
+
+        res = identity
+        n = max(k.bit_length() for k in scalars)
+        while n > 0:
+            res = res.dbl()
+            n -= 1
+            j = 0
+            for i, k in enumerate(scalars):
+                j |= ((k >> n) & 1) << i
+            if j:
+                res = add(res, table[j])
+        return res.projective() if bases is not points else res
+
+    def _multi_scalar_mul_values(self, bases, scalars):
+        """Joint double-and-add of `_multi_scalar_mul` on residues, for normalized `ExtendedPoint` `bases`.
+
+        The table entries are tuples (x, y, t, d*t) for `_extended_madd_values`, normalized with a
+        single inversion, as in `_wnaf_tables_values`: a `Point` is only built for the result.
+
+        """
+        p, a, d = self.field.p, self._a_small, self.d.value
+        # table[j] = ∑ bases[i] for the bits i of j, without the neutral element table[0]
+        table = []
+        for base in bases:
+            x, y, t = base.x.value, base.y.value, base.t.value
+            dt = d*t % p
+            table += [(x, y, t, 1)] + [_extended_madd_values(*q, x, y, dt, a, p) for q in table]
+        entries = []
+        for q, z_inv in zip(table, self.field._batch_invert_values([q[3] for q in table])):
+            x, y = q[0] * z_inv % p, q[1] * z_inv % p
+            entries.append((x, y, x*y % p * d % p))
+        table = [None] + entries
+
+        res = None
+        n = max(k.bit_length() for k in scalars)
+        while n > 0:
+            n -= 1
+            if res is not None:
+                res = _extended_dbl_values(res[0], res[1], res[3], a, p)
+            j = 0
+            for i, k in enumerate(scalars):
+                j |= ((k >> n) & 1) << i
+            if j:
+                x, y, dt = table[j]
+                if res is None:
+                    res = (x, y, x*y % p, 1)
+                else:
+                    res = _extended_madd_values(res[0], res[1], res[2], res[3], x, y, dt, a, p)
+        if res is None:
+            return self(0, 1, 1)
+        return self._from_values((res[0], res[1], res[3]))
+
     def random(self):
         """Returns a random point of `self`."""
         x = self.field.random()
-        while not ((1-self.a*x**2)/(1-self.d*x**2)).is_square():
+        # (1-ax²)/(1-dx²) and (1-ax²)*(1-dx²) have the same Legendre symbol
+        while not ((1-self.a*x**2)*(1-self.d*x**2)).is_square():
             x = self.field.random()
-        y = ((1-self.a*x**2)/(1-self.d*x**2)).sqrt()
+        y = self.field.sqrt_ratio(1-self.a*x**2, 1-self.d*x**2)
         return self.Point(x, y, self.field(1), self)
 
+    def random_batch(self, n, seed=None):
+        """Returns a list of `n` random points of `self`.
+
+        The x-coordinates are drawn in bulk (see `Field.random_batch`), and the divisions,
+        Legendre symbols and square roots are computed on vectors of coordinates.
+
+        """
+        rng = None if seed is None else random.Random(seed)
+        one = self.field(1)
+        points = []
+        while len(points) < n:
+            # about half of the x-coordinates are on the curve
+            x = self.field._new_vector(self.field._random_values(2*(n-len(points)), rng))
+            x2 = x.square()
+            y, squares = ((1 - x2*self.a) / (1 - x2*self.d)).sqrt()
+            points += [self.Point(xi, yi, one, self) for xi, yi, square in zip(x, y, squares) if square]
+        return points[:n]
+
     def j_inv(self):
         """Returns the j-invariant of `self`.
 
@@ -67,7 +670,11 @@ class Edwards:
         # ax² + y² = 1 + dx²y² => x² = (1-y²)/(a -dy²)
         # Try to recover x.
         # If it does not exist, or if zero and xs are wrong, fail.
-        x = ((1-y**2)/(self.a-self.d*y**2)).sqrt()
+        denominator = self.a-self.d*y**2
+        # y² = a/d: no point with this y-coordinate, see `batch_decode`
+        if denominator == 0:
+            return (None, None)
+        x = self.field.sqrt_ratio(1-y**2, denominator)
         if x is None or (x == 0 and xs != (x.value % p) % 2):
             return (None, None)
         # If sign of x isn't correct, flip it.
@@ -76,6 +683,212 @@ class Edwards:
         # Return the constructed point.
         return self(x, y, 1)
 
+    def batch_in_prime_subgroup(self, points, width=4):
+        """Membership booleans of `points` in the subgroup of order r, using the endomorphism φ.
+
+        (m1, m2) is a vector of the GLV lattice (see `src/decomposition.py`): m1 + λ*m2 = 0 mod r,
+        so that [m1]P + [m2]φ(P) = O for P of order r. The other points of Bandersnatch have a
+        nonzero component T of order 2, and m1 is odd and m2 even: the sum is then T + O ≠ O.
+        The test is a two-dimensional multiplication by half-scalars of 127 bits instead of a
+        multiplication by r, and the tables of all the points share a single inversion.
+        The neutral element belongs to the subgroup, the points at infinity do not.
+        Reference:
+        https://eprint.iacr.org/2021/1152.pdf
+
+        """
+        scalars = [self.decomposition.m1, self.decomposition.m2]
+        # φ is not defined at infinity
+        finite = [point for point in points if point.z != 0]
+        tables = self._wnaf_tables([q for point in finite for q in (point, point.φ())], width)
+        identity = self(0, 1, 1)
+        result = []
+        i = 0
+        for point in points:
+            if point.z == 0:
+                result.append(False)
+                continue
+            result.append(self._wnaf_multi_scalar_mul([], scalars, width, tables[i:i+2]) == identity)
+            i += 2
+        return result
+
+    def batch_decode(self, encodings, b):
+        """Decoding of all `encodings` following the format of RFC 8032, see `decode_base`.
+
+        The denominators a - dy² of the square roots share a single field inversion, so that only
+        the exponentiation of the square root remains per encoding; the Jacobi symbol rejects the
+        non-squares before it. An invalid encoding gives `(None, None)` at its index and does not
+        stop the batch.
+
+        """
+        p = self.field.p
+        integer = self.field.backend.integer
+        mask = (1 << (b-1)) - 1
+        # signs[i] is None for an invalid encoding
+        signs = []
+        ys = []
+        for s in encodings:
+            if len(s) != b//8:
+                signs.append(None)
+                ys.append(0)
+                continue
+            y = int.from_bytes(s, byteorder="little")
+            sign, y = y >> (b-1), y & mask
+            if y >= p:
+                signs.append(None)
+                ys.append(0)
+                continue
+            signs.append(sign)
+            ys.append(integer(y))
+        return [(None, None) if point is None else point for point in self._batch_recover_x(ys, signs)]
+
+    def _batch_recover_x(self, ys, signs):
+        """Points with the y-coordinates `ys` (residues) and the parities `signs` of their x-coordinates.
+
+        See `batch_decode`: the x-coordinates are square roots of (1-y²)/(a-dy²), whose
+        denominators share a single field inversion. A sign None, or a y-coordinate without
+        point, gives None at its index.
+
+        """
+        field = self.field
+        p = field.p
+        jacobi = field.backend.jacobi
+        sqrt_value = field._sqrt_value
+        a, d = self.a.value, self.d.value
+        # x² = (1-y²)/(a-dy²)
+        squares = [y * y % p for y in ys]
+        inverses = field._batch_invert_values([(a - d * y2) % p for y2 in squares])
+        one = field(1)
+        result = []
+        for sign, y, y2, inverse in zip(signs, ys, squares, inverses):
+            # a-dy² = 0 has no inverse: there is no point with this y-coordinate
+            if sign is None or inverse == 0:
+                result.append(None)
+                continue
+            ratio = (1 - y2) * inverse % p
+            x = sqrt_value(ratio) if jacobi(ratio, p) >= 0 else None
+            if x is None or (x == 0 and sign != 0):
+                result.append(None)
+                continue
+            if x % 2 != sign:
+                x = p - x
+            result.append(self.Point(field._new(x), field._new(y), one, self))
+        return result
+
+    def montgomery(self):
+        """Birationally equivalent Montgomery curve Bv² = u³ + Au² + u, computed at the first use.
+
+        A = 2(a+d)/(a-d) and B = 4/(a-d), and (x, y) ↦ (u, v) = ((1+y)/(1-y), u/x) maps the
+        generator. The curve maps back to `self` (see `Montgomery.edwards`).
+        Reference:
+        https://eprint.iacr.org/2008/013.pdf theorem 3.2.
+
+        """
+        if self._montgomery_twin is None:
+            # src/curve/montgomery.py imports this module
+            from src.curve.montgomery import Montgomery
+            twin = Montgomery((self.a+self.d)*2/(self.a-self.d), self.field(4)/(self.a-self.d), self.r, self.h)
+            twin.generator = self.generator.to_montgomery(twin).normalize()
+            twin._edwards_twin = self
+            self._montgomery_twin = twin
+        return self._montgomery_twin
+
+    def batch_to_montgomery(self, points, curve=None):
+        """Affine points of the Montgomery curve `curve` (by default `montgomery()`) with the u-coordinates (1+y)/(1-y) of `points`.
+
+        The denominators share a single field inversion, see `Point.to_montgomery`. The neutral
+        element is mapped to the point at infinity.
+
+        """
+        if curve is None:
+            curve = self.montgomery()
+        p = self.field.p
+        new = self.field._new
+        one, infinity = self.field(1), self.field(0)
+        inverses = self.field._batch_invert_values([(point.z.value - point.y.value) % p for point in points])
+        return [curve.Point(new((point.z.value + point.y.value) * inverse % p), one, curve) if inverse != 0
+                else curve.Point(one, infinity, curve) for point, inverse in zip(points, inverses)]
+
+    def batch_normalize(self, points):
+        """Affine representation of all `points`, sharing a single field inversion, see `Point.normalize`."""
+        one = self.field(1)
+        result = []
+        for point, z_inv in zip(points, self.field.batch_invert([point.z for point in points])):
+            if point.z == 0:
+                result.append(point.normalize())
+            else:
+                result.append(self.Point(point.x * z_inv, point.y * z_inv, one, self))
+        return result
+
+    def batch_encode(self, points, b):
+        """Encodings of all `points` following the format of RFC 8032, sharing a single field inversion.
+
+        Returns a list of `bytearray`, see `Point.encode_base`. Raises ValueError if one of the points
+        is at infinity.
+
+        """
+        return self._encode_values([point.x.value for point in points], [point.y.value for point in points],
+                                   [point.z.value for point in points], b)
+
+    def _encode_values(self, x, y, z, b):
+        """Encodings of the points of coordinates the residues `x`, `y` and `z`, see `batch_encode`."""
+        width = b//8
+        p = self.field.p
+        sign = 1 << (b-1)
+        # the batch inversion maps z = 0 to 0: it would encode the point as zero
+        if any(zi == 0 for zi in z):
+            raise ValueError("Points at infinity have no encoding")
+        encodings = []
+        for xi, yi, z_inv in zip(x, y, self.field._batch_invert_values(z)):
+            encoding = int(yi * z_inv % p)
+            if xi * z_inv % p % 2 != 0:
+                encoding |= sign
+            encodings.append(bytearray(encoding.to_bytes(width, "little")))
+        return encodings
+
+    def encode_array(self, points, b, out=None, offset=0):
+        """Encodings of `points` following the format of RFC 8032, as consecutive records of b/8 bytes.
+
+        A single field inversion is shared by all the points. The records are written at `offset`
+        in the writable buffer `out`, or in a new `bytearray` if `out` is None. Returns the buffer.
+
+        """
+        return self._write_records(self.batch_encode(points, b), b//8, out, offset)
+
+    @staticmethod
+    def _write_records(records, width, out=None, offset=0):
+        """Write the `records` of `width` bytes at `offset` in `out` (a new `bytearray` if None), see `encode_array`."""
+        size = len(records) * width
+        if out is None:
+            out = bytearray(size)
+        view = memoryview(out).cast("B")
+        if len(view) < offset + size:
+            raise ValueError("Buffer too small for {} records of {} bytes".format(len(records), width))
+        view[offset:offset+size] = b"".join(records)
+        return out
+
+    def point_batch(self, points):
+        """`PointBatch` of the coordinates of `points`."""
+        return self.PointBatch([point.x.value for point in points], [point.y.value for point in points],
+                               [point.z.value for point in points], self)
+
+    def decode_array(self, data, b, offset=0, n=None):
+        """Points decoded from consecutive records of b/8 bytes, see `encode_array` and `decode_base`.
+
+        `data` is read through a `memoryview` from `offset`, without copying the records. `n` records
+        are read, or all the remaining ones if `n` is None. The records are decoded together by
+        `batch_decode`: an invalid record gives `(None, None)`.
+
+        """
+        width = b//8
+        view = memoryview(data).cast("B")[offset:]
+        if n is None:
+            if len(view) % width != 0:
+                raise ValueError("Truncated record: {} bytes is not a multiple of {}".format(len(view), width))
+            n = len(view) // width
+        elif len(view) < n * width:
+            raise ValueError("Buffer too small for {} records of {} bytes".format(n, width))
+        return self.batch_decode([view[i:i+width] for i in range(0, n * width, width)], b)
+
     class Point:
         def __init__(self, x, y, z, curve):
             self.x = x
@@ -118,19 +931,31 @@ class Edwards:
                 elif self.y == 0:
                     return self.curve(1, 0, 0)
                 raise ("This should not happen")
-            return self.curve(self.x/self.z, self.y/self.z, 1)
+            z_inv = self.curve.field(1)/self.z
+            return self.curve(self.x*z_inv, self.y*z_inv, 1)
 
         def neg(self):
             return self.curve(-self.x, self.y, self.z)
 
+        def extended(self):
+            """Extended coordinates (XZ:YZ:XY:Z²) of the projective point, see `Edwards.ExtendedPoint`."""
+            if self.z == 0:
+                raise ValueError("Points at infinity have no extended coordinates")
+            return self.curve.ExtendedPoint(self.x*self.z, self.y*self.z, self.x*self.y, self.z**2, self.curve)
+
         def in_curve(self):
             """Returns the curve membership boolean."""
             if self.z == 0:
                 return self.x*self.y == 0
-            x = self.x/self.z
             a = self.curve.a
             d = self.curve.d
-            return ((1-a*x**2)/(1-d*x**2)).is_square()
+            x2, z2 = self.x**2, self.z**2
+            # (1-ax²)/(1-dx²) for x = X/Z has the Legendre symbol of (Z²-aX²)*(Z²-dX²): no division.
+            return ((z2-a*x2)*(z2-d*x2)).is_square()
+
+        def _is_identity(self):
+            """Return the boolean `self` == (0:1:1), without building the neutral element."""
+            return self.x.value == 0 and self.y.value == self.z.value != 0
 
         def dbl(self):
             """Doubling algorithm.
@@ -139,24 +964,15 @@ class Edwards:
             https://eprint.iacr.org/2008/013.pdf page 12.
 
             """
-            if self.z == 0 and self.x * self.y == 0:  # (1,0,0) and (0,1,0) are of order 2
-                return self.curve(0, 1, 1)
-            if self == self.curve(0, 1, 1):
+            curve = self.curve
+            x, y, z = self.x.value, self.y.value, self.z.value
+            if z == 0 and x * y == 0:  # (1,0,0) and (0,1,0) are of order 2
+                return curve(0, 1, 1)
+            if x == 0 and y == z:
                 return self
-            x = self.x
-            y = self.y
-            z = self.z
-            b = (x+y)**2
-            c = x**2
-            d = y**2
-            e = self.curve.a * c
-            f = e + d
-            h = z**2
-            j = f-2*h
-            x_r = (b-c-d)*j
-            y_r = f * (e-d)
-            z_r = f*j
-            return self.curve(x_r, y_r, z_r)
+            if curve.lazy:
+                return curve._formula(_dbl_formula, (self.x, self.y, self.z), curve.a)
+            return curve._from_values(_dbl_values(x, y, z, curve._a_small, curve.field.p))
 
         def add(self, q):
             """Addition algorithm.
@@ -165,27 +981,42 @@ class Edwards:
             https://eprint.iacr.org/2008/013.pdf page 12.
 
             """
-            if self == self.curve(0, 1, 1):
+            if self._is_identity():
                 return q
-            if q == self.curve(0, 1, 1):
+            if q._is_identity():
                 return self
-            x_p, y_p, z_p = self.x, self.y, self.z
-            x_q, y_q, z_q = q.x, q.y, q.z
-            a = z_p * z_q
-            b = a**2
-            c = x_p * x_q
-            d = y_p * y_q
-            e = self.curve.d * c * d
-            f = b-e
-            g = b+e
-            x_r = a*f*((x_p+y_p) * (x_q+y_q) - c - d)
-            y_r = a*g*(d-self.curve.a*c)
-            z_r = f*g
-            return self.curve(x_r, y_r, z_r)
+            curve = self.curve
+            if curve.lazy:
+                return curve._formula(_add_formula, (self.x, self.y, self.z, q.x, q.y, q.z), curve.a, curve.d)
+            return curve._from_values(_add_values(self.x.value, self.y.value, self.z.value, q.x.value, q.y.value,
+                                                  q.z.value, curve._a_small, curve.d.value, curve.field.p))
 
         def __add__(self, q):
             return self.add(q)
 
+        def reduction_counts(self, q):
+            """Number of modular reductions of the formulas of `dbl` and `add` (with `q`).
+
+            Returns a dictionary {operation: (eager, lazy)} where `eager` counts the reductions
+            of `Field.Element` arithmetic (see `Field.Strict`) and `lazy` those of `Field.Lazy` arithmetic.
+
+            """
+            field = self.curve.field
+            operations = {
+                'dbl': (_dbl_formula, [self.x, self.y, self.z, self.curve.a]),
+                'add': (_add_formula, [self.x, self.y, self.z, q.x, q.y, q.z, self.curve.a, self.curve.d]),
+            }
+            counts = {}
+            for name, (formula, coordinates) in operations.items():
+                count = []
+                for strict in [True, False]:
+                    start = field.reductions
+                    for c in formula(*[c.lazy(strict) for c in coordinates]):
+                        c.reduce()
+                    count.append(field.reductions - start)
+                counts[name] = tuple(count)
+            return counts
+
         def naive_mul(self, k):
             """Scalar multiplication `k` * `self`.
 
@@ -194,107 +1025,30 @@ class Edwards:
             TODO not constant time
 
             """
-            if k == 0:
-                return self.curve(0, 1, 1)
-            if k < 0:
-                k = -k
-                self = self.neg()
-            res = self.curve(0, 1, 1)
-            temp = self
-            k = int(k)
-            n = k.bit_length()
-            # msb -> lsb
-            while n > 0:
-                res = res.dbl()
-                n -= 1
-                if (k >> n) & 1:
-                    res += self
-                k &= ~(1 << n)
-            return res
+            return self.curve._multi_scalar_mul([self], [k])
 
         def multi_scalar_mul_2(self, k, q, l):
             """Compute k*self + l*q using GLV trick. It is a four-dimensional scalar multiplication."""
             if k == 0 and l == 0:
                 return self.curve(0, 1, 1)
 
-            m1 = int(-113482231691339203864511368254957623327)
-            m2 = int(10741319382058138887739339959866629956)
-            m3 = int(21482638764116277775478679919733259912)
-            b = [floor(mpq(k*m1, self.curve.r)),
-                 floor(mpq(k*m2, self.curve.r))]
-            k1 = k-b[0] * m1 - b[1] * m3
-            k2 = -b[0] * m2 - b[1] * -m1
-
-            b = [floor(mpq(l*m1, self.curve.r)),
-                 floor(mpq(l*m2, self.curve.r))]
-            l1 = l-b[0] * m1 - b[1] * m3
-            l2 = -b[0] * m2 - b[1] * -m1
-
+            k1, k2 = self.curve.decomposition.decompose(k)
+            l1, l2 = self.curve.decomposition.decompose(l)
+            if self is self.curve.generator and self.curve.extended:
+                # the wide tables of the generator are computed once
+                return self.curve._wnaf_multi_scalar_mul([self, self.φ(), q, q.φ()], [k1, k2, l1, l2], 5,
+                                                         self.curve._generator_wnaf_tables())
             return self.multi_scalar_mul_4(k1, self.φ(), k2, q, l1, q.φ(), l2)
 
-        def multi_scalar_mul_4(self, k1, q, k2, r, k3, s, k4):
+        def multi_scalar_mul_4(self, k1, q, k2, r, k3, s, k4, width=5):
             """Multi scalar multiplication `k1` * `self` + `k2` * `q` + `k3` * `r` + `k4` * `s`.
 
-            From most significant bit (MSB) to least significant bit (LSB)
+            Interleaved windows: each point has its table of odd multiples and the scalars are
+            recoded in wNAF of width `width` (see `Edwards._wnaf_multi_scalar_mul`).
             TODO not constant time.
 
             """
-            s0, s1, s2, s3, p0, p1, p2, p3 = k1, k2, k3, k4, self, q, r, s
-
-            p0 = p0.neg() if int(s0) < 0 else p0
-            p1 = p1.neg() if int(s1) < 0 else p1
-            p2 = p2.neg() if int(s2) < 0 else p2
-            p3 = p3.neg() if int(s3) < 0 else p3
-            s0 = abs(int(s0))
-            s1 = abs(int(s1))
-            s2 = abs(int(s2))
-            s3 = abs(int(s3))
-
-            if s0 == 0 and s1 == 0 and s2 == 0 and s3 == 0:
-                return self.curve(0, 1, 1)
-
-            if s1 > s0:
-                s0, p0, s1, p1 = s1, p1, s0, p0
-            if s2 > s0:
-                s0, p0, s2, p2 = s2, p2, s0, p0
-            if s3 > s0:
-                s0, p0, s3, p3 = s3, p3, s0, p0
-            # s1,s2,s3 ≤ s0
-
-            res = self.curve(0, 1, 1)
-            prec = [[[[None]*2 for _ in range(2)]
-                     for _ in range(2)] for _ in range(2)]
-            prec[0][0][0][0] = res
-            prec[0][0][0][1] = p3
-            prec[0][0][1][0] = p2
-            prec[0][0][1][1] = p2 + p3
-            prec[0][1][0][0] = p1
-            prec[0][1][0][1] = p1 + p3
-            prec[0][1][1][0] = p1 + p2
-            prec[0][1][1][1] = prec[0][0][1][1] + p1
-            prec[1][0][0][0] = p0
-            prec[1][0][0][1] = p0 + p3
-            prec[1][0][1][0] = p0 + p2
-            prec[1][0][1][1] = prec[0][0][1][1] + p0
-            prec[1][1][0][0] = p0 + p1
-            prec[1][1][0][1] = prec[1][0][0][1] + p1
-            prec[1][1][1][0] = prec[1][1][0][0] + p2
-            prec[1][1][1][1] = prec[1][1][1][0] + p3
-            s0 = int(s0)
-            s1 = int(s1)
-            s2 = int(s2)
-            s3 = int(s3)
-            n = s0.bit_length()
-            while n > 0:
-                res = res.dbl()
-                n -= 1
-                res += prec[(s0 >> n) & 1][(s1 >> n) &
-                                           1][(s2 >> n) & 1][(s3 >> n) & 1]
-                s0 &= ~(1 << n)
-                s1 &= ~(1 << n)
-                s2 &= ~(1 << n)
-                s3 &= ~(1 << n)
-            return res
+            return self.curve._wnaf_multi_scalar_mul([self, q, r, s], [k1, k2, k3, k4], width)
 
         def is_prime_order(self, n):
             """Returns the boolean corresponding to `self.order() == n`.
@@ -311,33 +1065,23 @@ class Edwards:
             else:
                 return n_times_p == self.curve(0, 1, 1)
 
+        def in_prime_subgroup(self):
+            """Membership boolean of `self` in the subgroup of order r, see `Edwards.batch_in_prime_subgroup`."""
+            return self.curve.batch_in_prime_subgroup([self])[0]
+
         def φ(self):
             """Endomorphism sqrt(-2).
 
-            TODO can be optimized with factorization of multi-variable polynomials.
-            Obtained using `sage sage/φ.sage`.
+            The rational map obtained using `sage sage/φ.sage` is factored, see `_φ_formula`.
 
             """
-            ay4 = 0x1d46e71b2d28e06c42bc1f5a41f4a0156d070863689e8862eb12927f72f308c3
-            ay2z2 = 0x20b21e58881722d68c92fa09709ea65d716e869843e94c821df033483694a51a
-            az4 = 0x1373fe65dcb354e5209f902de5b37008d6c2721d8d6d5fb556e8b7e969c053c9
-            by2 = 0x33937d60e9a0dd55ed1f9030e7c8b6fa9c42e1e41d2f1361a0fed9630f711cae
-            bz2 = 0x39a33e54438fe0155ae18e93205d4395acfe4be1127ca6458fc0270450b1b50d
-            cy2 = 0x2cdc91c2ed341d7901e6d6ece64cd98591c66ba64cdc7109d1bdd9cb6f93ee68
-            cz2 = 0x405a29f23ffc9ff2461a47d721d9210ab77ac21ee2cf489d5f01269bf08ee353
-
-            x = self.x
-            y = self.y
-            z = self.z
-            x_r = x * (ay4 * y**4 + ay2z2 * y**2 * z**2 + az4 * z**4)
-            y_r = y * z**2 * (by2 * y**2 + bz2 * z**2)
-            z_r = y * z**2 * (cy2 * y**2 + cz2 * z**2)
-            return self.curve(x_r, y_r, z_r)
-
-        def glv(self, k):
+            return self.curve._formula(_φ_formula, (self.x, self.y, self.z), *self.curve._φ_constants)
+
+        def glv(self, k, width=4):
             """GLV scalar multiplication `k`*`self`.
 
-            WARNING: this does not work when k = r for example!!!!!!!
+            The two half-scalars (see `src/decomposition.py`) are recoded in wNAF of width `width`
+            (see `src/recoding.py`). `self` must be of order r: `k` is reduced modulo r.
             Reference:
             https://www.iacr.org/archive/crypto2001/21390189.pdf
 
@@ -345,41 +1089,10 @@ class Edwards:
             if k == 0:
                 return self.curve(0, 1, 1)
 
-            m1 = int(-113482231691339203864511368254957623327)
-            m2 = int(10741319382058138887739339959866629956)
-            m3 = int(21482638764116277775478679919733259912)
-            b = [floor(mpq(k*m1, self.curve.r)),
-                 floor(mpq(k*m2, self.curve.r))]
-            s0 = k-b[0] * m1 - b[1] * m3
-            s1 = -b[0] * m2 - b[1] * -m1
-
-            p0, p1 = self, self.φ()
+            s0, s1 = self.curve.decomposition.decompose(k)
 
             # Multi scalar multiplication with small scalars
-            p0 = p0.neg() if int(s0) < 0 else p0
-            p1 = p1.neg() if int(s1) < 0 else p1
-            s0 = abs(int(s0))
-            s1 = abs(int(s1))
-
-            if s0 == 0 and s1 == 0:
-                return self.curve(0, 1, 1)
-
-            if s1 > s0:
-                s0, p0, s1, p1 = s1, p1, s0, p0
-            # s1 ≤ s0
-
-            res = self.curve(0, 1, 1)
-            prec = [[res, p1], [p0, p0+p1]]
-            s0 = int(s0)
-            s1 = int(s1)
-            n = s0.bit_length()
-            while n > 0:
-                res = res.dbl()
-                n -= 1
-                res = res + prec[(s0 >> n) & 1][(s1 >> n) & 1]
-                s0 &= ~(1 << n)
-                s1 &= ~(1 << n)
-            return res
+            return self.curve._wnaf_multi_scalar_mul([self, self.φ()], [s0, s1], width)
 
         def __rmul__(self, k):
             """Scalar multiplication with the scalar give first.
@@ -389,15 +1102,230 @@ class Edwards:
             """
             return self.glv(k)
 
+        def ladder_mul(self, k):
+            """Scalar multiplication `k` * `self` on the Montgomery ladder of `Edwards.montgomery`.
+
+            `self` is mapped to (u, v) = ((1+y)/(1-y), u/x) with a single inversion. The x-only
+            ladder (see `Montgomery._ladder_values`) gives the u-coordinates of kP and (k+1)P, from
+            which the v-coordinate of kP is recovered (see `Montgomery._recover_y_values`): the
+            result (X:Y:Z) is mapped back to (X(X+Z):Y(X-Z):Y(X+Z)) without division nor square
+            root. The ladder runs on the bit length of r, or of `k` if it is longer: `k` is not
+            reduced and `self` can be of any order.
+
+            """
+            curve = self.curve
+            k = int(k)
+            if k < 0:
+                return self.neg().ladder_mul(-k)
+            x, y, z = self.x.value, self.y.value, self.z.value
+            if z == 0:
+                return self.naive_mul(k)
+            if x == 0:
+                # neutral element, or (0, -1) of order 2: no v-coordinate
+                return self if k % 2 else curve(0, 1, 1)
+            twin = curve.montgomery()
+            field = curve.field
+            p = field.p
+            # 1/((1-y)x) = z²/((z-y)X)
+            inverse = field.backend.invert((z - y) * x % p, p)
+            u = (z + y) * x % p * inverse % p
+            v = (z + y) * z % p * inverse % p
+            x1, z1, x2, z2 = twin._ladder_values(u, k, max(k.bit_length(), curve.r.bit_length()))
+            if z1 == 0:
+                return curve(0, 1, 1)
+            if z2 == 0:
+                # kP = -P
+                return self.neg()
+            if x1 == 0:
+                # kP = (0, -1) of order 2, where the recovered v-coordinate is 0
+                return curve(0, -1, 1)
+            x_q, y_q, z_q = twin._recover_y_values(u, v, x1, z1, x2, z2)
+            return curve._from_values((x_q * (x_q + z_q) % p, y_q * (x_q - z_q) % p, y_q * (x_q + z_q) % p))
+
+        def to_montgomery(self, curve=None):
+            """Point (Z+Y:Z-Y) of the Montgomery curve `curve` (by default `Edwards.montgomery()`), without division.
+
+            The u-coordinate is (1+y)/(1-y): the neutral element is mapped to the point at infinity.
+
+            """
+            if curve is None:
+                curve = self.curve.montgomery()
+            return curve(self.z + self.y, self.z - self.y)
+
         def encode_base(self, b):
             """Decoding following the formate of RFC 8032.
 
             Reference: https://datatracker.ietf.org/doc/html/rfc8032
 
             """
-            xp, yp = self.x/self.z, self.y/self.z
+            z_inv = self.curve.field(1)/self.z
+            xp, yp = self.x*z_inv, self.y*z_inv
             p = self.curve.field.p
             s = bytearray(int(yp.value % p).to_bytes(b//8, byteorder='little'))
             if (xp.value % p) % 2 != 0:
                 s[(b-1)//8] |= 1 << (b-1) % 8
             return s
+
+    class ExtendedPoint:
+        """Point in extended coordinates (X:Y:T:Z), with x = X/Z, y = Y/Z and xy = T/Z.
+
+        The addition costs one multiplication less than in projective coordinates, and the
+        unified formulas need no special case for the neutral element (0:1:0:1).
+        Reference:
+        https://eprint.iacr.org/2008/522.pdf section 3.
+
+        """
+
+        def __init__(self, x, y, t, z, curve):
+            self.x = x
+            self.y = y
+            self.t = t
+            self.z = z
+            self.curve = curve
+
+        def __repr__(self):
+            return "ExtendedPoint ({}, {}, {}, {})".format(self.x, self.y, self.t, self.z)
+
+        def __eq__(self, other):
+            """Return the equality boolean between `self` and `other`."""
+            return self.x * other.z == other.x * self.z and self.y * other.z == other.y * self.z
+
+        def projective(self):
+            """Projective point (X:Y:Z)."""
+            return self.curve.Point(self.x, self.y, self.z, self.curve)
+
+        def neg(self):
+            return self.curve.ExtendedPoint(-self.x, self.y, -self.t, self.z, self.curve)
+
+        def dbl(self):
+            """Doubling algorithm.
+
+            Reference:
+            https://eprint.iacr.org/2008/522.pdf section 3.3.
+
+            """
+            return self.curve._formula(_extended_dbl_formula, (self.x, self.y, self.z), self.curve.a,
+                                       point=self.curve.ExtendedPoint)
+
+        def add(self, q):
+            """Unified addition algorithm.
+
+            Reference:
+            https://eprint.iacr.org/2008/522.pdf section 3.1.
+
+            """
+            return self.curve._formula(_extended_add_formula, (self.x, self.y, self.t, self.z, q.x, q.y, q.t, q.z),
+                                       self.curve.a, self.curve.d, point=self.curve.ExtendedPoint)
+
+        def madd(self, q):
+            """Mixed addition algorithm, for `q` with Z = 1."""
+            return self.curve._formula(_extended_madd_formula, (self.x, self.y, self.t, self.z, q.x, q.y, q.t),
+                                       self.curve.a, self.curve.d, point=self.curve.ExtendedPoint)
+
+        def φ(self):
+            """Endomorphism sqrt(-2) in extended coordinates, without division, see `_extended_φ_formula`."""
+            return self.curve._formula(_extended_φ_formula, (self.x, self.y, self.z), *self.curve._φ_constants,
+                                       point=self.curve.ExtendedPoint)
+
+        def __add__(self, q):
+            return self.add(q)
+
+    class PointBatch:
+        """Points stored as a structure of arrays: the lists `x`, `y` and `z` of the residues of their coordinates.
+
+        n `Point` objects hold 3n `Field.Element` objects, each with its own reference to the field;
+        a `PointBatch` holds three lists of n residues, about a third of the memory. The operations
+        are pointwise and run on the residues (see `_dbl_values` and `_add_values`): a `Point` is
+        only built by indexing.
+
+        """
+        __slots__ = ('x', 'y', 'z', 'curve')
+
+        def __init__(self, x, y, z, curve):
+            self.x = x
+            self.y = y
+            self.z = z
+            self.curve = curve
+
+        def __len__(self):
+            return len(self.x)
+
+        def __getitem__(self, index):
+            return self.curve._from_values((self.x[index], self.y[index], self.z[index]))
+
+        def __iter__(self):
+            return (self[i] for i in range(len(self.x)))
+
+        def __repr__(self):
+            return "PointBatch of {} points".format(len(self.x))
+
+        def __eq__(self, other):
+            """Return the boolean of the pointwise equality of `self` and `other`, see `Point.__eq__`."""
+            if len(other) != len(self):
+                return False
+            p = self.curve.field.p
+            for i, (x1, y1, z1, x2, y2, z2) in enumerate(zip(self.x, self.y, self.z, other.x, other.y, other.z)):
+                if z1 != 0 and z2 != 0:
+                    if (x1 * z2 - x2 * z1) % p != 0 or (y1 * z2 - y2 * z1) % p != 0:
+                        return False
+                elif self[i] != other[i]:
+                    return False
+            return True
+
+        def _check_length(self, other):
+            if len(other) != len(self):
+                raise ValueError("Batches of {} and {} points".format(len(self), len(other)))
+
+        def neg(self):
+            """Pointwise negation."""
+            p = self.curve.field.p
+            return self.curve.PointBatch([-x % p for x in self.x], self.y, self.z, self.curve)
+
+        def dbl(self):
+            """Pointwise doubling, see `Point.dbl`."""
+            p, a = self.curve.field.p, self.curve._a_small
+            x_r, y_r, z_r = [], [], []
+            for x, y, z in zip(self.x, self.y, self.z):
+                if z == 0 and x * y == 0:  # (1,0,0) and (0,1,0) are of order 2
+                    x, y, z = 0, 1, 1
+                else:
+                    x, y, z = _dbl_values(x, y, z, a, p)
+                x_r.append(x)
+                y_r.append(y)
+                z_r.append(z)
+            return self.curve.PointBatch(x_r, y_r, z_r, self.curve)
+
+        def add(self, other):
+            """Pointwise addition of `self` and the `PointBatch` `other`, see `Point.add`."""
+            self._check_length(other)
+            curve = self.curve
+            p, a, d = curve.field.p, curve._a_small, curve.d.value
+            x_r, y_r, z_r = [], [], []
+            for x_p, y_p, z_p, x_q, y_q, z_q in zip(self.x, self.y, self.z, other.x, other.y, other.z):
+                x, y, z = _add_values(x_p, y_p, z_p, x_q, y_q, z_q, a, d, p)
+                x_r.append(x)
+                y_r.append(y)
+                z_r.append(z)
+            return curve.PointBatch(x_r, y_r, z_r, curve)
+
+        def __add__(self, other):
+            return self.add(other)
+
+        def normalize(self):
+            """Affine representation of all the points, sharing a single field inversion, see `Point.normalize`."""
+            p = self.curve.field.p
+            x_r, y_r, z_r = [], [], []
+            for x, y, z, z_inv in zip(self.x, self.y, self.z, self.curve.field._batch_invert_values(self.z)):
+                if z == 0:
+                    # (0,1,0) or (1,0,0)
+                    x, y = (0, 1) if x == 0 else (1, 0)
+                else:
+                    x, y, z = x * z_inv % p, y * z_inv % p, 1
+                x_r.append(x)
+                y_r.append(y)
+                z_r.append(z)
+            return self.curve.PointBatch(x_r, y_r, z_r, self.curve)
+
+        def encode(self, b, out=None, offset=0):
+            """Encodings of the points as consecutive records of b/8 bytes, see `Edwards.encode_array`."""
+            return self.curve._write_records(self.curve._encode_values(self.x, self.y, self.z, b), b//8, out, offset)
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
-from math import floor
-from gmpy2 import mpq, mpz, mod
+import random
+from src.field import Field
+from src.curve.edwards import Edwards
+from src.decomposition import GLVDecomposition, M1, M2, M3
 
 
 def constant_time_swap(swap_flag, a, b):
@@ -14,15 +16,87 @@ def constant_time_swap(swap_flag, a, b):
     return a_new, b_new
 
 
+def _dbl_formula(x, z, a24):
+    """Doubling formula of https://eprint.iacr.org/2017/212.pdf algorithm 2.
+
+    The coordinates are `Field.Element` or `Field.Lazy` objects.
+
+    """
+    v1 = x+z
+    v1 = v1**2
+    v2 = x-z
+    v2 = v2**2
+    x_r = v1*v2
+    v1 = v1-v2
+    v3 = a24*v1
+    v3 = v3+v2
+    z_r = v1*v3
+    return x_r, z_r
+
+
+def _add_formula(x_p, z_p, x_q, z_q, xm, zm):
+    """Differential addition formula of https://eprint.iacr.org/2017/212.pdf algorithm 1.
+
+    The coordinates are `Field.Element` or `Field.Lazy` objects.
+
+    """
+    v0 = x_p + z_p
+    v1 = x_q - z_q
+    v1 = v1 * v0
+    v0 = x_p - z_p
+    v2 = x_q + z_q
+    v2 = v2*v0
+    v3 = v1+v2
+    v3 = v3**2
+    v4 = v1-v2
+    v4 = v4**2
+    x_r = zm * v3
+    z_r = xm * v4
+    return x_r, z_r
+
+
+def _point_swap(swap_flag, a, b):
+    """Constant time swap of the residues (X, Z) of two points, see `constant_time_swap`."""
+    x_a, x_b = constant_time_swap(swap_flag, a[0], b[0])
+    z_a, z_b = constant_time_swap(swap_flag, a[1], b[1])
+    return (x_a, z_a), (x_b, z_b)
+
+
+def _dbl_values(x, z, a24, p):
+    """Doubling on reduced residues, see `_dbl_formula`."""
+    v1 = (x+z)**2 % p
+    v2 = (x-z)**2 % p
+    v3 = v1 - v2
+    return v1*v2 % p, v3*((a24*v3 + v2) % p) % p
+
+
+def _add_values(x_p, z_p, x_q, z_q, xm, zm, p):
+    """Differential addition on reduced residues, see `_add_formula`."""
+    v1 = (x_q - z_q)*(x_p + z_p) % p
+    v2 = (x_q + z_q)*(x_p - z_p) % p
+    return zm*((v1+v2)**2 % p) % p, xm*((v1-v2)**2 % p) % p
+
+
 class Montgomery:
-    def __init__(self, a, b, r, h):
+    def __init__(self, a, b, r, h, lazy=False):
         self.field = a.field
         self.a = a
         self.b = b
         self.r = r
         self.h = h
+        # Lazy modular reduction in the formulas of `Point.dbl` and `Point.add`
+        self.lazy = lazy
         self.a24 = (self.a+2)/4
-        self.generator = self.Point(self.field(0xa), 1, self)
+        # GLV decomposition for `Point.φ`: sign difference with Edwards model, see `src/decomposition.py`
+        self.decomposition = GLVDecomposition(r, -M1, M2, M3)
+        self.generator = self.Point(self.field(0xa), self.field(1), self)
+        # Constants (c, α, β, γ) of `Point.φ` (c = a + 2) and of `Point.φ_minus_one`, see `φ.sage`
+        self._φ_constants = (self.a + 2,) + tuple(self.field(c) for c in (
+            13017314467421381532402061398313046228820690393386411611562176812113295071440,
+            14989411347484419666605643019079533103863186413725217032868654387860539633484,
+            39953720565912266872856944794434720047230584117801669040511822283402326025498))
+        # Birationally equivalent Edwards curve of `fixed_base_mul`, computed at the first use
+        self._edwards_twin = None
 
     def __repr__(self):
         return "Montgomery curve defined by {}*y^2 = x^3 + {}*x^2 + x".format(self.b, self.a)
@@ -30,19 +104,204 @@ class Montgomery:
     __str__ = __repr__
 
     def __call__(self, x, z):
-        if isinstance(x, int) or isinstance(x, mpz):
+        if not isinstance(x, Field.Element):
             x = self.field(x)
-        if isinstance(z, int) or isinstance(z, mpz):
+        if not isinstance(z, Field.Element):
             z = self.field(z)
         return self.Point(x, z, self)
 
+    def _formula(self, formula, coordinates, *constants):
+        """Evaluate `formula` on `coordinates` and `constants`, with lazy reduction if `self.lazy`."""
+        if not self.lazy:
+            return self.Point(*formula(*coordinates, *constants), self)
+        result = formula(*[c.lazy() for c in coordinates], *constants)
+        return self.Point(*[c.reduce() for c in result], self)
+
     def random(self):
         """Returns a random point of `self`."""
         x = self.field.random()
-        while not (((x**3 + self.a*x**2 + x) / self.b).is_square()):
+        # (x³ + ax² + x)/b and (x³ + ax² + x)*b have the same Legendre symbol
+        while not (((x**3 + self.a*x**2 + x) * self.b).is_square()):
             x = self.field.random()
         return self.Point(x, self.field(1), self)
 
+    def random_batch(self, n, seed=None):
+        """Returns a list of `n` random points of `self`.
+
+        The x-coordinates are drawn in bulk (see `Field.random_batch`), and the Legendre symbols
+        are computed on vectors of coordinates.
+
+        """
+        rng = None if seed is None else random.Random(seed)
+        one = self.field(1)
+        points = []
+        while len(points) < n:
+            # about half of the x-coordinates are on the curve
+            x = self.field._new_vector(self.field._random_values(2*(n-len(points)), rng))
+            squares = ((x.square() + x*self.a + 1) * x * self.b).is_square()
+            points += [self.Point(xi, one, self) for xi, square in zip(x, squares) if square]
+        return points[:n]
+
+    def batch_normalize(self, points):
+        """Affine representation of all `points`, sharing a single field inversion."""
+        inverses = self.field.batch_invert([point.z for point in points])
+        return [self.Point(point.x * z_inv, self.field(1), self) if point.z != 0 else self(1, 0)
+                for point, z_inv in zip(points, inverses)]
+
+    def encode_array(self, points, out=None, offset=0):
+        """Affine x-coordinates of `points` as consecutive little-endian records, see `FieldVector.to_bytes`.
+
+        A single field inversion is shared by all the points. As in RFC 7748, the point at
+        infinity is encoded as zero.
+
+        """
+        x = self.field._new_vector([point.x.value for point in points])
+        z = self.field._new_vector([point.z.value for point in points])
+        return (x * z.inverse()).to_bytes(out, offset)
+
+    def point_batch(self, points):
+        """`PointBatch` of the coordinates of `points`."""
+        return self.PointBatch([point.x.value for point in points], [point.z.value for point in points], self)
+
+    def decode_array(self, data, offset=0, n=None):
+        """Points with the affine x-coordinates decoded from `data`, see `Field.vector_from_bytes`."""
+        one = self.field(1)
+        return [self.Point(x, one, self) for x in self.field.vector_from_bytes(data, offset, n)]
+
+    def fixed_base_mul(self, k, window=6):
+        """Scalar multiplication `k` * `self.generator` with precomputed tables, see `Edwards.fixed_base_mul`.
+
+        The tables are computed on the twisted Edwards curve ax² + y² = 1 + dx²y² with
+        a = (A+2)/B and d = (A-2)/B, birationally equivalent to `self` through u = (1+y)/(1-y):
+        the result (X:Y:Z) is mapped back to (Z+Y:Z-Y) without division.
+        Reference:
+        https://eprint.iacr.org/2008/013.pdf theorem 3.2.
+
+        """
+        q = self.edwards().fixed_base_mul(k, window)
+        return self.Point(q.z + q.y, q.z - q.y, self)
+
+    def edwards(self):
+        """Birationally equivalent twisted Edwards curve ax² + y² = 1 + dx²y², computed at the first use.
+
+        a = (A+2)/B and d = (A-2)/B, and (u, v) ↦ (x, y) = (u/v, (u-1)/(u+1)) maps the generator.
+        The x-only points are mapped by `Point.to_edwards`.
+        Reference:
+        https://eprint.iacr.org/2008/013.pdf theorem 3.2.
+
+        """
+        if self._edwards_twin is None:
+            twin = Edwards((self.a+2)/self.b, (self.a-2)/self.b, self.r, self.h)
+            u = self.generator.x / self.generator.z
+            v = ((u**3 + self.a*u**2 + u)/self.b).sqrt()
+            twin.generator = twin(u/v, (u-1)/(u+1), 1)
+            self._edwards_twin = twin
+        return self._edwards_twin
+
+    def batch_to_edwards(self, points, curve=None):
+        """Points of the Edwards curve `curve` (by default `edwards()`) with the y-coordinates (u-1)/(u+1) of `points`.
+
+        The denominators u+1 share a single field inversion, and so do the denominators of the
+        x-coordinates, recovered from the curve equation as in `Edwards.batch_decode`: only the
+        square roots remain per point. An x-only point is defined modulo {±1}, and so is its
+        image: the even x-coordinate is chosen. The points of the twist (and the u-coordinates
+        without affine image) give None at their index.
+
+        """
+        if curve is None:
+            curve = self.edwards()
+        p = self.field.p
+        inverses = self.field._batch_invert_values([(point.x.value + point.z.value) % p for point in points])
+        ys, signs = [], []
+        for point, inverse in zip(points, inverses):
+            ys.append((point.x.value - point.z.value) * inverse % p)
+            # u = -1 is not on the curve: there is no inverse of u+1
+            signs.append(0 if inverse != 0 else None)
+        return curve._batch_recover_x(ys, signs)
+
+    def _ladder_values(self, x1, k, n_bits):
+        """Residues (X2, Z2, X3, Z3) of `k` * P and (`k`+1) * P for the affine x-coordinate `x1` of P, by the ladder of RFC 7748.
+
+        The n_bits bits of `k` ≥ 0 are read by shifts, without a list of bits. The accumulators
+        (X2, Z2, X3, Z3) of the backend hold residues (updated in place with xmpz), and they are
+        swapped with masks (see `IntBackend.cswap`): with a fixed `n_bits`, the sequence of
+        operations does not depend on `k`. The cached `a24` is used by every step.
+
+        """
+        backend = self.field.backend
+        p, a24 = self.field.p, self.a24.value
+        x1 = backend.integer(x1)
+        ladder_step, cswap = backend.ladder_step, backend.cswap
+        acc = backend.accumulators([1, 0, x1, 1])
+        swap = 0
+        for i in range(n_bits - 1, -1, -1):
+            bit = (k >> i) & 1
+            cswap(acc, swap ^ bit)
+            swap = bit
+            ladder_step(acc, x1, a24, p)
+        cswap(acc, swap)
+        return backend.values(acc)
+
+    def _recover_y_values(self, u, v, x1, z1, x2, z2):
+        """Residues (X, Y, Z) of Q = kP from the affine coordinates (`u`, `v`) of P, and the residues (X1, Z1) of Q and (X2, Z2) of Q + P.
+
+        Q and Q + P are the outputs of `_ladder_values`. With w = 2BvZ1Z2:
+            X = wX1, Z = wZ1
+            Y = Z2((X1 + uZ1 + 2AZ1)(uX1 + Z1) - 2AZ1²) - (X1 - uZ1)²X2
+        without inversion nor square root. Q + P must not be the point at infinity (w = 0), and
+        Q must not be of order 2 (Y = 0).
+        Reference:
+        K. Okeya and K. Sakurai, Efficient elliptic curve cryptosystems from a scalar multiplication
+        algorithm with recovery of the y-coordinate on a Montgomery-form elliptic curve, CHES 2001.
+
+        """
+        p = self.field.p
+        a2 = 2 * self.a.value
+        a2z1 = a2 * z1 % p
+        uz1 = u * z1 % p
+        y = (z2 * ((x1 + uz1 + a2z1) * (u * x1 + z1) % p - a2z1 * z1) - (x1 - uz1)**2 % p * x2) % p
+        w = 2 * self.b.value * v % p * z1 % p * z2 % p
+        return w * x1 % p, y, w * z1 % p
+
+    def _ladder_2d_values(self, k1, k2, p_, q_, p_plus_q, p_minus_q, n_bits):
+        """Residues (X, Z) of `k1` * P + `k2` * Q for `k1`, `k2` ≥ 0, by a two-dimensional differential ladder.
+
+        `p_`, `q_`, `p_plus_q` and `p_minus_q` are the residues (X, Z) of P, Q, P+Q and P-Q.
+        The ladder holds the four corners C[i][j] = (a+i)P + (b+j)Q for the leading bits (a, b)
+        of the scalars. For the next bits (u, v), the corners of (2a+u, 2b+v) are
+            2C[u][v], C[0][v] + C[1][v], C[u][0] + C[u][1] and C[1][0] + C[0][1]
+        of differences P, Q and P-Q: one doubling and three differential additions whatever the
+        bits. The corners are swapped with masks (see `constant_time_swap`) so that C[u][v] is
+        always in the first position, and the difference of the last addition becomes P+Q when
+        u ≠ v: the sequence of operations only depends on `n_bits`.
+        Reference:
+        D. J. Bernstein, Differential addition chains, 2006.
+
+        """
+        p, a24 = self.field.p, self.a24.value
+        # corners (0, 0), (1, 0), (0, 1), (1, 1) of the leading bits (0, 0)
+        c00, c10, c01, c11 = (1, 0), p_, q_, p_plus_q
+        rows = columns = 0
+        for i in range(n_bits - 1, -1, -1):
+            u = (k1 >> i) & 1
+            v = (k2 >> i) & 1
+            # swap the rows, then the columns, so that C[u][v] is c00
+            c00, c10 = _point_swap(rows ^ u, c00, c10)
+            c01, c11 = _point_swap(rows ^ u, c01, c11)
+            c00, c01 = _point_swap(columns ^ v, c00, c01)
+            c10, c11 = _point_swap(columns ^ v, c10, c11)
+            rows, columns = u, v
+            difference, _ = _point_swap(u ^ v, p_minus_q, p_plus_q)
+            c00, c10, c01, c11 = (_dbl_values(c00[0], c00[1], a24, p),
+                                  _add_values(c00[0], c00[1], c10[0], c10[1], p_[0], p_[1], p),
+                                  _add_values(c00[0], c00[1], c01[0], c01[1], q_[0], q_[1], p),
+                                  _add_values(c10[0], c10[1], c01[0], c01[1], difference[0], difference[1], p))
+        # the corner (0, 0) is at the position (rows, columns)
+        c00, c10 = _point_swap(rows, c00, c10)
+        c01, c11 = _point_swap(rows, c01, c11)
+        c00, c01 = _point_swap(columns, c00, c01)
+        return c00
+
     def j_inv(self):
         """Returns the j-invariant of `self`.
 
@@ -88,9 +347,10 @@ class Montgomery:
             """Returns the curve membership boolean."""
             if self.z == 0:
                 return True
-            x = self.x/self.z
+            x, z = self.x, self.z
+            # x³ + ax² + x for x = X/Z has the Legendre symbol of (X³ + aX²Z + XZ²)*Z: no division.
             # `not()` because self.curve.b is a non-square!
-            return not ((x**3 + self.curve.a*x**2 + x).is_square()) + twist == 1
+            return not ((x*(x*(x + self.curve.a*z) + z**2)*z).is_square()) + twist == 1
 
         def dbl(self):
             """Doubling algorithm.
@@ -99,18 +359,7 @@ class Montgomery:
             https://eprint.iacr.org/2017/212.pdf algorithm 2.
 
             """
-            x = self.x
-            z = self.z
-            v1 = x+z
-            v1 = v1**2
-            v2 = x-z
-            v2 = v2**2
-            x_r = v1*v2
-            v1 = v1-v2
-            v3 = self.curve.a24*v1
-            v3 = v3+v2
-            z_r = v1*v3
-            return self.curve(x_r, z_r)
+            return self.curve._formula(_dbl_formula, (self.x, self.z), self.curve.a24)
 
         def add(self, q, p_minus_q):
             """Differential addition algorithm.
@@ -120,90 +369,88 @@ class Montgomery:
             https://eprint.iacr.org/2017/212.pdf algorithm 1.
 
             """
-            x_p, z_p = self.x, self.z
-            x_q, zQ = q.x, q.z
-            xm, zm = p_minus_q.x, p_minus_q.z
-            v0 = x_p + z_p
-            v1 = x_q - zQ
-            v1 = v1 * v0
-            v0 = x_p - z_p
-            v2 = x_q + zQ
-            v2 = v2*v0
-            v3 = v1+v2
-            v3 = v3**2
-            v4 = v1-v2
-            v4 = v4**2
-            x_r = zm * v3
-            z_r = xm * v4
-            return self.curve(x_r, z_r)
+            return self.curve._formula(_add_formula, (self.x, self.z, q.x, q.z, p_minus_q.x, p_minus_q.z))
+
+        def reduction_counts(self, q, p_minus_q):
+            """Number of modular reductions of the formulas of `dbl` and `add` (with `q` and `p_minus_q`).
+
+            Returns a dictionary {operation: (eager, lazy)} where `eager` counts the reductions
+            of `Field.Element` arithmetic (see `Field.Strict`) and `lazy` those of `Field.Lazy` arithmetic.
+
+            """
+            field = self.curve.field
+            operations = {
+                'dbl': (_dbl_formula, [self.x, self.z, self.curve.a24]),
+                'add': (_add_formula, [self.x, self.z, q.x, q.z, p_minus_q.x, p_minus_q.z]),
+            }
+            counts = {}
+            for name, (formula, coordinates) in operations.items():
+                count = []
+                for strict in [True, False]:
+                    start = field.reductions
+                    for c in formula(*[c.lazy(strict) for c in coordinates]):
+                        c.reduce()
+                    count.append(field.reductions - start)
+                counts[name] = tuple(count)
+            return counts
 
         def naive_mul(self, k):
             """Scalar multiplication `k` * `self`.
 
+            Montgomery ladder on residues (see `Montgomery._ladder_values`) on the bit length of
+            `k`, after the normalization of `self`: unlike `mul_rfc_7748`, the length of the ladder
+            depends on `k`.
             Reference:
             https://eprint.iacr.org/2017/212.pdf algorithm 3.
 
             """
-            if k == 0:
-                return self.curve(1, 0)
-            k = abs(k)  # computation modulo {±1}
-            r0 = self
-            r1 = r0.dbl()
-            i = 0
-            r1_minus_r0 = r0
-            k_bits = [int(bit) for bit in bin(k)[2:]]
-            for i in range(1, len(k_bits)):
-                if k_bits[i] == 0:
-                    [r0, r1] = [r0.dbl(), r0.add(r1, r1_minus_r0)]
-                else:
-                    [r0, r1] = [r0.add(r1, r1_minus_r0), r1.dbl()]
-            if r0.z == 0:
-                return self.curve(1, 0)
-            return r0
-
-        def constant_time_point_swap(self, other, swap_flag):
-            p_1, p_2 = self, other
-            p_1_x, p_2_x = constant_time_swap(
-                swap_flag, p_1.x.value, p_2.x.value)
-            p_1_z, p_2_z = constant_time_swap(
-                swap_flag, p_1.z.value, p_2.z.value)
-            return self.curve(p_1_x, p_1_z), self.curve(p_2_x, p_2_z)
+            curve = self.curve
+            k = abs(int(k))  # computation modulo {±1}
+            if k == 0 or self.z == 0:
+                return curve(1, 0)
+            x1 = self.x.value if self.z.value == 1 else (self.x / self.z).value
+            if x1 == 0:
+                # (0, 1) of order 2, where the ladder of RFC 7748 gives 0
+                return self if k % 2 else curve(1, 0)
+            x2, z2, _, _ = curve._ladder_values(x1, k, k.bit_length())
+            if z2 == 0:
+                return curve(1, 0)
+            new = curve.field._new
+            return curve.Point(new(x2), new(z2), curve)
+
+        def to_edwards(self, curve=None):
+            """Point of the Edwards curve `curve` (by default `Montgomery.edwards()`) with the u-coordinate of `self`, see `Montgomery.batch_to_edwards`."""
+            return self.curve.batch_to_edwards([self], curve)[0]
 
         def mul_rfc_7748(self, k):
-            """Scalar multiplication `k` * `self` following RFC 7748.
+            """Scalar multiplication `k` * `self` following RFC 7748, see `Montgomery._ladder_values`.
 
             Reference:
             https://datatracker.ietf.org/doc/html/rfc7748
             """
-            if k == 0:
-                return self.curve(1, 0)
-            k = abs(k)  # computation modulo {±1}
-            r0 = self
-            r1 = r0.dbl()
-            i = 0
-            r1_minus_r0 = r0
-            k_bits = [int(bit) for bit in bin(k)[2:]]
-            swap = 0
-            for i in range(1, len(k_bits)):
-                swap ^= k_bits[i]
-                r0, r1 = r0.constant_time_point_swap(r1, swap)
-                r0, r1 = r0.dbl(), r0.add(r1, r1_minus_r0)
-            # TODO is it `not(swap)`` or `swap`? Papers say `swap`` but here it works with `not(swap)`
-            r0, r1 = r0.constant_time_point_swap(r1, not (swap))
-            if r0.z == 0:
-                return self.curve(1, 0)
-            return r0
+            curve = self.curve
+            if k == 0 or self.z == 0:
+                return curve(1, 0)
+            k = abs(int(k))  # computation modulo {±1}
+            x1 = self.x.value if self.z.value == 1 else (self.x / self.z).value
+            x2, z2, _, _ = curve._ladder_values(x1, k, max(k.bit_length(), curve.r.bit_length()))
+            if z2 == 0:
+                return curve(1, 0)
+            new = curve.field._new
+            return curve.Point(new(x2), new(z2), curve)
 
         def multi_scalar_mul(self, k1, other, k2, other_minus_self, constant_time=False):
             """Multi scalar multiplication `k1` * `self` + `k2` * `other`.
 
+            With `constant_time`, the fixed-length ladder `multi_scalar_mul_ladder` is used instead.
             Reference:
             https://eprint.iacr.org/2017/212.pdf Algorithm 9.
 
             """
+            if constant_time:
+                return self.multi_scalar_mul_ladder(k1, other, k2, other_minus_self)
             s0, s1, p0, p1, pm = k1, k2, self, other, other_minus_self
 
-            # TODO is it constant-time ? is swapping constant time really important?
             if s0 < 0:
                 s0 = -s0
                 pm = p0.add(p1, pm)
@@ -216,44 +463,82 @@ class Montgomery:
 
             while s0 != 0:
                 if s1 < s0:
-                    if constant_time:
-                        _ = p0.dbl()
-                        _ = p0.add(p1, pm)
                     s0, s1, p0, p1, pm, = s1, s0,  p1,  p0, pm
                 if s1 <= 4*s0:
-                    if constant_time:
-                        _ = p0.dbl()
                     s0, s1, p0, p1, pm, = s0, s1 - s0,  p1.add(p0, pm), p1, p0
-                elif mod(s0-s1, 2) == 0:
+                elif (s0-s1) % 2 == 0:
                     s0, s1, p0, p1, pm, = s0, (s1 -
                                                s0) >> 1, p0.add(p1, pm), p1.dbl(), pm
-                elif mod(s1, 2) == 0:
+                elif s1 % 2 == 0:
                     s0, s1, p0, p1, pm, = s0, s1 >> 1,  p0,  p1.dbl(), p1.add(pm, p0)
                 else:
                     s0, s1, p0, p1, pm, = s0 >> 1, s1,  p0.dbl(), p1, p0.add(pm, p1)
-            while mod(s1, 2) == 0:
-                if constant_time:
-                    _ = p0.dbl()
+            while s1 % 2 == 0:
                 s1, p1 = s1 >> 1, p1.dbl()
             if s1 > 1:
                 p1 = p1.naive_mul(s1)
             return p1
 
+        def multi_scalar_mul_ladder(self, k1, other, k2, other_minus_self, n_bits=None):
+            """Multi scalar multiplication `k1` * `self` + `k2` * `other` by a two-dimensional ladder.
+
+            See `Montgomery._ladder_2d_values`: every bit costs one doubling and three differential
+            additions, for any scalars of `n_bits` bits (by default the bit length of the largest).
+            The signs of the scalars only exchange the differences P+Q and P-Q, with a masked swap.
+
+            """
+            curve = self.curve
+            if n_bits is None:
+                n_bits = max(abs(int(k1)).bit_length(), abs(int(k2)).bit_length())
+            p_plus_q = self.add(other, other_minus_self)
+            # k1*P + k2*Q = ±(|k1|*(±P) + |k2|*Q): with opposite signs, P+Q and P-Q are exchanged
+            plus, minus = _point_swap(int((k1 < 0) != (k2 < 0)), (p_plus_q.x.value, p_plus_q.z.value),
+                                      (other_minus_self.x.value, other_minus_self.z.value))
+            x, z = curve._ladder_2d_values(abs(int(k1)), abs(int(k2)), (self.x.value, self.z.value),
+                                           (other.x.value, other.z.value), plus, minus, n_bits)
+            if z == 0:
+                return curve(1, 0)
+            new = curve.field._new
+            return curve.Point(new(x), new(z), curve)
+
         def is_prime_order(self, N):
             """Returns the boolean corresponding to `self.order() == N`."""
             return self.naive_mul(N).z == 0 and self.z != 0
 
+        def in_prime_subgroup(self):
+            """Membership boolean of `self` in the subgroup of order r, using the endomorphism φ.
+
+            As in `Edwards.batch_in_prime_subgroup`, [m1]P + [m2]φ(P) = O exactly for the points P of
+            order r, with (m1, m2) a vector of the GLV lattice: this is a two-dimensional differential
+            addition chain (`multi_scalar_mul`, not constant time: the points are public) with
+            half-scalars of 127 bits. The points of order 2 (with y = 0) are rejected first, as φ
+            maps them to the differences where the differential addition is not defined, and so are
+            the points of the twist: the chain also vanishes on some of them, such as (±1, 1) of
+            order 4. The neutral element belongs to the subgroup.
+
+            """
+            x, z = self.x, self.z
+            if z == 0:
+                return True
+            if x * (x * (x + self.curve.a * z) + z**2) == 0:
+                return False
+            if not self.in_curve():
+                return False
+            decomposition = self.curve.decomposition
+            return self.multi_scalar_mul(decomposition.m1, self.φ(), decomposition.m2, self.φ_minus_one()).z == 0
+
         def φ(self):
             """Endomorphism sqrt(-2).
 
+            With c = a + 2: φ(x, z) = (-(x-z)² - cxz, 2xz) = ((x-z)² + cxz, -2xz).
             Reference:
             https://eprint.iacr.org/2021/1152.pdf page 6.
 
             """
             x = self.x
             z = self.z
-            c = self.curve.a+2  # TODO can be hard-coded
-            return self.curve(-(x-z)**2-c*x*z, 2*x*z)
+            xz = x*z
+            return self.curve((x-z)**2 + self.curve._φ_constants[0]*xz, -(xz+xz))
 
         def φ_minus_one(self):
             """Endomorphism sqrt(-2) - [1].
@@ -261,18 +546,16 @@ class Montgomery:
             More information in the file `φ.sage`.
 
             """
-            α = self.curve.field(
-                13017314467421381532402061398313046228820690393386411611562176812113295071440)
-            β = self.curve.field(
-                14989411347484419666605643019079533103863186413725217032868654387860539633484)
-            γ = self.curve.field(
-                39953720565912266872856944794434720047230584117801669040511822283402326025498)
-            return self.curve(α * self.x * (self.x + self.z * β)**2, self.z * (self.x + γ * self.z)**2)
+            _, α, β, γ = self.curve._φ_constants
+            x = self.x
+            z = self.z
+            return self.curve(α * x * (x + β*z)**2, z * (x + γ*z)**2)
 
         def glv(self, k, constant_time=False):
             """GLV scalar multiplication `k`*`self`.
 
-            A constant time option is available.
+            With `constant_time`, the half-scalars go through `multi_scalar_mul_ladder` with the
+            bit length of the bound of the decomposition, the same for every `k`.
             Reference:
             https://www.iacr.org/archive/crypto2001/21390189.pdf
             More information in the file `φ.sage`.
@@ -280,15 +563,12 @@ class Montgomery:
             """
             if k == 0:
                 return self.curve(1, 0)
-            # sign difference with Edwards model
-            m1 = int(113482231691339203864511368254957623327)
-            m2 = int(10741319382058138887739339959866629956)
-            m3 = int(21482638764116277775478679919733259912)
-            b = [floor(mpq(k*m1, self.curve.r)),
-                 floor(mpq(k*m2, self.curve.r))]
-            k1 = k-b[0] * m1 - b[1] * m3
-            k2 = -b[0] * m2 - b[1] * -m1
-            return self.multi_scalar_mul(k1, self.φ(), k2, self.φ_minus_one(), constant_time=constant_time)
+            decomposition = self.curve.decomposition
+            k1, k2 = decomposition.decompose(k)
+            if constant_time:
+                return self.multi_scalar_mul_ladder(k1, self.φ(), k2, self.φ_minus_one(),
+                                                    n_bits=decomposition.bound.bit_length())
+            return self.multi_scalar_mul(k1, self.φ(), k2, self.φ_minus_one())
 
         def __rmul__(self, k, constant_time=False):
             """Scalar multiplication with the scalar give first.
@@ -316,3 +596,79 @@ class Montgomery:
         #     y_q = ((x_q**3 + a*x_q**2 + x_q)/b).sqrt()
 
         #     return self.curve(b * (x_q * y_p - x_p*y_q)**2 / (x_p*x_q*(x_p-x_q)**2), 1)
+
+    class PointBatch:
+        """Points stored as a structure of arrays: the lists `x` and `z` of the residues of their coordinates.
+
+        See `Edwards.PointBatch`. The operations are pointwise and run on the residues (see
+        `_dbl_values` and `_add_values`): a `Point` is only built by indexing.
+
+        """
+        __slots__ = ('x', 'z', 'curve')
+
+        def __init__(self, x, z, curve):
+            self.x = x
+            self.z = z
+            self.curve = curve
+
+        def __len__(self):
+            return len(self.x)
+
+        def __getitem__(self, index):
+            new = self.curve.field._new
+            return self.curve.Point(new(self.x[index]), new(self.z[index]), self.curve)
+
+        def __iter__(self):
+            return (self[i] for i in range(len(self.x)))
+
+        def __repr__(self):
+            return "PointBatch of {} points".format(len(self.x))
+
+        def __eq__(self, other):
+            """Return the boolean of the pointwise equality of `self` and `other` modulo {±1}, see `Point.__eq__`."""
+            if len(other) != len(self):
+                return False
+            p = self.curve.field.p
+            return all((x1 * z2 - x2 * z1) % p == 0 for x1, z1, x2, z2 in zip(self.x, self.z, other.x, other.z))
+
+        def _check_length(self, other):
+            if len(other) != len(self):
+                raise ValueError("Batches of {} and {} points".format(len(self), len(other)))
+
+        def neg(self):
+            """Pointwise negation: the x-coordinate of -P is the one of P."""
+            return self.curve.PointBatch(list(self.x), list(self.z), self.curve)
+
+        def dbl(self):
+            """Pointwise doubling, see `Point.dbl`."""
+            p, a24 = self.curve.field.p, self.curve.a24.value
+            x_r, z_r = [], []
+            for x, z in zip(self.x, self.z):
+                x, z = _dbl_values(x, z, a24, p)
+                x_r.append(x)
+                z_r.append(z)
+            return self.curve.PointBatch(x_r, z_r, self.curve)
+
+        def add(self, other, difference):
+            """Pointwise differential addition of `self` and `other`, given the `PointBatch` `difference`, see `Point.add`."""
+            self._check_length(other)
+            self._check_length(difference)
+            p = self.curve.field.p
+            x_r, z_r = [], []
+            for x_p, z_p, x_q, z_q, xm, zm in zip(self.x, self.z, other.x, other.z, difference.x, difference.z):
+                x, z = _add_values(x_p, z_p, x_q, z_q, xm, zm, p)
+                x_r.append(x)
+                z_r.append(z)
+            return self.curve.PointBatch(x_r, z_r, self.curve)
+
+        def normalize(self):
+            """Affine representation of all the points, sharing a single field inversion, see `Point.normalize`."""
+            p = self.curve.field.p
+            x_r = [x * z_inv % p if z != 0 else 1
+                   for x, z, z_inv in zip(self.x, self.z, self.curve.field._batch_invert_values(self.z))]
+            return self.curve.PointBatch(x_r, [1 if z != 0 else 0 for z in self.z], self.curve)
+
+        def encode(self, out=None, offset=0):
+            """Affine x-coordinates of the points as consecutive records, see `Montgomery.encode_array`."""
+            x = self.curve.field._new_vector(self.x)
+            return (x * self.curve.field._new_vector(self.z).inverse()).to_bytes(out, offset)
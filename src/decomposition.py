@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""GLV decomposition of the scalars of Bandersnatch.
+
+Reference:
+https://www.iacr.org/archive/crypto2001/21390189.pdf
+
+"""
+
+# Short basis ((M1, M2), (M3, -M1)) of the lattice {(a, b): a + λ*b = 0 mod r} for the eigenvalue
+# λ = LAMBDA of the endomorphism φ of the Edwards model, obtained using `sage sage/φ.sage`.
+# The eigenvalue of φ on the Montgomery model is -λ, with the basis ((-M1, M2), (M3, M1)).
+M1 = -113482231691339203864511368254957623327
+M2 = 10741319382058138887739339959866629956
+M3 = 21482638764116277775478679919733259912
+LAMBDA = -8913659658109529928382530854484400854125314752504019737736543920008458395397
+
+
+class GLVDecomposition:
+    """Decomposition k = k1 + λ*k2 mod r with half-scalars k1, k2 of about half the size of r.
+
+    For the basis ((m1, m2), (m3, -m1)) of determinant -r, the coordinates of (k, 0) in the
+    basis are (k*m1/r, k*m2/r): they are rounded to (b1, b2) and
+    (k1, k2) = (k, 0) - b1*(m1, m2) - b2*(m3, -m1).
+    The divisions by r are replaced by multiplications by precomputed fixed-point multipliers
+    g = round(m * 2^s / r) followed by a shift of s bits. As k is first reduced modulo r, the
+    rounding errors e1, e2 are below 1/2 + 2^-8, and (k1, k2) = -e1*(m1, m2) - e2*(m3, -m1) gives
+    |k1| ≤ (1/2 + 2^-8)(|m1| + |m3|) and |k2| ≤ (1/2 + 2^-8)(|m1| + |m2|), for every k.
+
+    """
+
+    def __init__(self, r, m1, m2, m3):
+        self.r = r
+        self.m1 = m1
+        self.m2 = m2
+        self.m3 = m3
+        self.shift = r.bit_length() + 8
+        self.g1 = self._multiplier(m1)
+        self.g2 = self._multiplier(m2)
+        # Bound on the absolute values of the half-scalars
+        self.bound = (abs(m1) + max(abs(m2), abs(m3))) * 129 // 256 + 1
+
+    def _multiplier(self, m):
+        """Fixed-point approximation round(`m` * 2^shift / r)."""
+        return ((m << (self.shift + 1)) + self.r) // (2 * self.r)
+
+    def decompose(self, k):
+        """Half-scalars (k1, k2) with k = k1 + λ*k2 mod r."""
+        k = int(k) % self.r
+        half = 1 << (self.shift - 1)
+        b1 = (k * self.g1 + half) >> self.shift
+        b2 = (k * self.g2 + half) >> self.shift
+        return k - b1 * self.m1 - b2 * self.m3, b2 * self.m1 - b1 * self.m2
+
+    def batch_decompose(self, scalars):
+        """Half-scalars of all the `scalars`, as a list of pairs (k1, k2), see `decompose`."""
+        r, shift, half = self.r, self.shift, 1 << (self.shift - 1)
+        g1, g2, m1, m2, m3 = self.g1, self.g2, self.m1, self.m2, self.m3
+        result = []
+        for k in scalars:
+            k = int(k) % r
+            b1 = (k * g1 + half) >> shift
+            b2 = (k * g2 + half) >> shift
+            result.append((k - b1 * m1 - b2 * m3, b2 * m1 - b1 * m2))
+        return result
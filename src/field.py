@@ -1,23 +1,41 @@
 # -*- coding: utf-8 -*-
-from gmpy2 import random_state, mpz_random, invert, mpz, powmod, sign, f_mod
+import os
+import random
+from src.backend import get_backend
 
 
 class Field():
 
-    def __init__(self, p):
-        self.p = mpz(p)
-        self._rand_state = random_state()
-
-        # 2-adicity
-        self.two_adicity = 0
-        while f_mod(p-1, 1 << self.two_adicity) == 0:
-            self.two_adicity += 1
-        self.two_adicity -= 1
-
-        # Quadratic non-residue
-        self.non_square = self.Element(mpz(1), self)
-        while self.non_square.is_square():
-            self.non_square += self.Element(1, self)
+    def __init__(self, p, backend=None, two_adicity=None, non_square=None):
+        # Integer arithmetic: "gmpy2" (default when installed), "int" or "xmpz", see `src/backend.py`
+        self.backend = get_backend(backend)
+        self.p = self.backend.integer(p)
+        # State of the generator of `random`, created at the first draw (it is slow to initialize)
+        self._rand_state = None
+
+        # 2-adicity, computed if not given (see `src/params.py` for precomputed constants)
+        if two_adicity is None:
+            two_adicity = 0
+            while (p-1) % (1 << two_adicity) == 0:
+                two_adicity += 1
+            two_adicity -= 1
+        self.two_adicity = two_adicity
+
+        # Length in bytes of the little-endian encoding of an element, see `FieldVector.to_bytes`
+        self.byte_length = (self.p.bit_length() + 7) // 8
+
+        # Quadratic non-residue, searched if not given
+        if non_square is None:
+            non_square = self.backend.integer(1)
+            while self.backend.jacobi(non_square, self.p) != -1:
+                non_square += 1
+        self.non_square = self.Element(non_square, self)
+
+        # Square root tables, built by `_sqrt_precomputation` at the first square root
+        self._sqrt_tables = None
+
+        # Number of modular reductions of `Lazy` elements (instrumentation)
+        self.reductions = 0
 
     def __str__(self):
         return "Finite field of characteristic {}".format(self.p)
@@ -25,34 +43,270 @@ class Field():
     def __call__(self, value):
         return self.Element(value, self)
 
+    def _new(self, value):
+        """Trusted constructor of an element of `self`.
+
+        `value` must already be reduced, i.e. 0 ≤ `value` < `self.p`: no check nor reduction is done.
+
+        """
+        element = _new_element(self.Element)
+        element.value = value
+        element.field = self
+        return element
+
+    def vector(self, values):
+        """Vector of elements of `self`, see `FieldVector`."""
+        return FieldVector(values, self)
+
+    def _new_vector(self, values):
+        """Trusted constructor of a vector: `values` must be a list of reduced residues."""
+        vector = _new_element(FieldVector)
+        vector.values = values
+        vector.field = self
+        return vector
+
+    def vector_from_bytes(self, data, offset=0, n=None):
+        """Vector decoded from consecutive little-endian records of `self.byte_length` bytes.
+
+        `data` is any buffer (`bytes`, `bytearray`, `memoryview`, `mmap`...), read through a
+        `memoryview` from `offset`: the records are not copied. `n` records are read, or all the
+        remaining ones if `n` is None. Raises ValueError on a truncated buffer or on a
+        non-canonical record (a value ≥ `self.p`).
+
+        """
+        width = self.byte_length
+        view = memoryview(data).cast("B")[offset:]
+        if n is None:
+            if len(view) % width != 0:
+                raise ValueError("Truncated record: {} bytes is not a multiple of {}".format(len(view), width))
+            n = len(view) // width
+        elif len(view) < n * width:
+            raise ValueError("Buffer too small for {} records of {} bytes".format(n, width))
+        p = self.p
+        integer = self.backend.integer
+        values = [integer(int.from_bytes(view[i:i+width], "little")) for i in range(0, n * width, width)]
+        for i, value in enumerate(values):
+            if value >= p:
+                raise ValueError("Non-canonical encoding of record {}".format(i))
+        return self._new_vector(values)
+
     def random(self):
         """Compute a random element of `self`."""
         # probably not secure
-        return self.Element(mpz_random(self._rand_state, self.p), self)
+        if self._rand_state is None:
+            self._rand_state = self.backend.random_state()
+        return self._new(self.backend.random_below(self._rand_state, self.p))
+
+    def seed(self, seed=None):
+        """Reseed the generator of `random`, for reproducible sequences of elements."""
+        self._rand_state = self.backend.random_state(seed)
+
+    def random_batch(self, n, seed=None):
+        """Vector of `n` random elements of `self`, from a single bulk draw of random bytes.
+
+        The bytes come from `os.urandom`, or from a generator seeded with `seed` if given.
+
+        """
+        rng = None if seed is None else random.Random(seed)
+        return self._new_vector(self._random_values(n, rng))
+
+    def _random_values(self, n, rng=None):
+        """List of `n` random residues drawn from `rng` (a `random.Random`), or from `os.urandom` if `None`.
+
+        Each residue is reduced from 128 more bits than `self.p`, so the bias is negligible.
+
+        """
+        width = (self.p.bit_length() + 7) // 8 + 16
+        if rng is None:
+            data = os.urandom(n * width)
+        else:
+            data = rng.getrandbits(8 * n * width).to_bytes(n * width, "little") if n else b""
+        data = memoryview(data)
+        p = self.p
+        integer = self.backend.integer
+        return [integer(int.from_bytes(data[i:i+width], "little")) % p for i in range(0, n * width, width)]
+
+    def batch_invert(self, elements):
+        """Inverses of all `elements` using a single field inversion.
+
+        Montgomery's trick: 3(n-1) multiplications and one inversion instead of n inversions.
+        Zero has no inverse: zeros are returned unchanged and do not affect the other elements.
+        Reference:
+        P. L. Montgomery, Speeding the Pollard and elliptic curve methods of factorization, 1987.
+
+        """
+        return [self._new(value) for value in self._batch_invert_values([element.value for element in elements])]
+
+    def _batch_invert_values(self, values):
+        """Batch inversion of reduced residues, see `batch_invert`."""
+        p = self.p
+        # prefix[i] is the product of the non-zero values[:i]
+        prefix = []
+        acc = 1
+        for value in values:
+            prefix.append(acc)
+            if value:
+                acc = acc * value % p
+        inv = self.backend.invert(acc, p)
+        result = [0] * len(values)
+        for i in range(len(values) - 1, -1, -1):
+            value = values[i]
+            if value:
+                result[i] = inv * prefix[i] % p
+                inv = inv * value % p
+        return result
+
+    def batch_is_square(self, elements):
+        """Quadratic residuosity of all `elements`, as a list of booleans."""
+        p = self.p
+        jacobi = self.backend.jacobi
+        return [jacobi(element.value, p) >= 0 for element in elements]
+
+    def sqrt_ratio(self, u, v):
+        """Square root of `u`/`v`, or `None` if `u`/`v` is not a square.
+
+        The quotient is computed on the residues, without building intermediate elements.
+        The division-free formula c = u*v^(2^(s-1)-1)*(u*v^(2^s-1))^((q-1)/2) saves the inversion
+        but needs an extra exponentiation by 2^(s-1)-1, which is slower than an inversion with gmpy2.
+
+        """
+        u = u.value if isinstance(u, self.Element) else self(u).value
+        v = v.value if isinstance(v, self.Element) else self(v).value
+        root = self._sqrt_value(u * self.backend.invert(v, self.p) % self.p)
+        return None if root is None else self._new(root)
+
+    def _sqrt_precomputation(self):
+        """Tables for the square roots, computed once per field.
+
+        `g` generates the 2^s-th roots of unity, with s the 2-adicity. The discrete logarithm of
+        a root of unity in base `g` is computed by windows of w bits, using:
+        * a dictionary {h^m: m} for h = g^(2^(s-w)) of order 2^w,
+        * tables of g^(-m*2^k) for 0 ≤ m < 2^w and the offsets k used by the algorithm.
+        Reference:
+        https://eprint.iacr.org/2020/1407.pdf
+
+        """
+        p = self.p
+        integer, invert, powmod = self.backend.integer, self.backend.invert, self.backend.powmod
+        s = self.two_adicity
+        w = min(8, s)
+        n = -(-s // w)
+        q = (p-1) >> s
+        g = powmod(self.non_square.value, q, p)
+
+        h = powmod(g, 1 << (s-w), p)
+        dlog = {}
+        acc = integer(1)
+        for m in range(1 << w):
+            dlog[acc] = m
+            acc = acc * h % p
+
+        # x_i = t^(2^shifts[i]) gives the i-th window of the logarithm of t
+        shifts = [max(s - w*(i+1), 0) for i in range(n)]
+        offsets = {w*j + shifts[i] for i in range(n) for j in range(i)}
+        offsets |= {w*j for j in range(n)}
+        g_inv = invert(g, p)
+        tables = {}
+        for k in offsets:
+            base = powmod(g_inv, 1 << k, p)
+            table = [integer(1)]
+            for _ in range(1, 1 << w):
+                table.append(table[-1] * base % p)
+            tables[k] = table
+
+        self._sqrt_tables = (w, n, q, shifts, dlog, tables)
+        return self._sqrt_tables
+
+    def _sqrt_value(self, u):
+        """Square root of a reduced residue `u`, or `None`.
+
+        With c = u^((q+1)/2), we get c² = t*u where t = u^q is a 2^s-th root of unity.
+        If t = g^e, u is a square iff e is even and then sqrt(u) = c*g^(-e/2).
+
+        """
+        if u == 0:
+            return u
+        p = self.p
+        powmod = self.backend.powmod
+        s = self.two_adicity
+        w, n, q, shifts, dlog, tables = self._sqrt_tables or self._sqrt_precomputation()
+
+        b = powmod(u, (q-1) >> 1, p)
+        c = u * b % p
+        t = b * c % p
+
+        # x[i] = t^(2^shifts[i])
+        x = []
+        done = 0
+        for shift in reversed(shifts):
+            t = powmod(t, 1 << (shift - done), p)
+            done = shift
+            x.append(t)
+        x.reverse()
+
+        # discrete logarithm of t in base g, by windows of w bits
+        mask = (1 << w) - 1
+        e = 0
+        digits = []
+        for i in range(n):
+            xi = x[i]
+            for j in range(i):
+                if digits[j]:
+                    xi = xi * tables[w*j + shifts[i]][digits[j]] % p
+            digit = dlog[xi] >> (shifts[i] + w*i - (s-w))
+            digits.append(digit)
+            e |= digit << (w*i)
+        if e & 1:
+            return None
+
+        # Tonelli-Shanks returns c*g^(2^(s-1)-e/2) = -c*g^(-e/2) when e ≠ 0: keep the same root.
+        e >>= 1
+        negate = e != 0
+        j = 0
+        while e:
+            if e & mask:
+                c = c * tables[w*j][e & mask] % p
+            e >>= w
+            j += 1
+        return p - c if negate else c
 
     class Element:
+        __slots__ = ('value', 'field')
+
         def __init__(self, value, field):
             if 0 <= value < field.p:
                 self.value = value
             else:
-                self.value = f_mod(value, field.p)
+                self.value = field.backend.integer(value) % field.p
             self.field = field
 
         def __eq__(self, other):
             """Return the equality boolean between `self` and `other`."""
             if isinstance(other, int):
-                return self.value == f_mod(other, self.field.p)
+                return self.value == other % self.field.p
             return self.value == other.value
 
         def _convert_to_element(self, other):
-            if isinstance(other, self.__class__):
-                return other
-            return self.field(other)
+            """`other` (an integer, or an element of another class such as `Lazy`) as an `Element` of `self.field`.
+
+            Returns `NotImplemented` for a `FieldVector`: the reflected operator of the vector broadcasts `self`.
+
+            """
+            if isinstance(other, FieldVector):
+                return NotImplemented
+            return self.field(getattr(other, 'value', other))
 
         def __add__(self, other):
             """Addition of `self` and `other`."""
-            other = self._convert_to_element(other)
-            return self.field(self.value + other.value)
+            field = self.field
+            if other.__class__ is not self.__class__:
+                other = self._convert_to_element(other)
+                if other is NotImplemented:
+                    return NotImplemented
+            value = self.value + other.value
+            if value >= field.p:
+                value -= field.p
+            return field._new(value)
 
         def __radd__(self, other):
             """Addition when `other` is given first (mostly for `int` type)."""
@@ -60,12 +314,20 @@ class Field():
 
         def __neg__(self):
             """Negation of `self`."""
-            return self.field(-self.value)
+            field = self.field
+            return field._new(field.p - self.value if self.value else self.value)
 
         def __sub__(self, other):
             """Difference of `self` and `other`."""
-            other = self._convert_to_element(other)
-            return self.field(self.value - other.value)
+            field = self.field
+            if other.__class__ is not self.__class__:
+                other = self._convert_to_element(other)
+                if other is NotImplemented:
+                    return NotImplemented
+            value = self.value - other.value
+            if value < 0:
+                value += field.p
+            return field._new(value)
 
         def __rsub__(self, other):
             """Substraction when `other` is given first (mostly for `int` type)."""
@@ -73,8 +335,12 @@ class Field():
 
         def __mul__(self, other):
             """Multiplication of `self` and `other`."""
-            other = self._convert_to_element(other)
-            return self.field(self.value * other.value)
+            field = self.field
+            if other.__class__ is not self.__class__:
+                other = self._convert_to_element(other)
+                if other is NotImplemented:
+                    return NotImplemented
+            return field._new(self.value * other.value % field.p)
 
         def __rmul__(self, other):
             """Multiplication when `other` is given first (mostly for `int` type)."""
@@ -82,67 +348,300 @@ class Field():
 
         def __pow__(self, exponent):
             """Modular exponentiation `self` to the power `exponent`."""
-            result = powmod(self.value, exponent, self.field.p)
-            return self.field(result)
+            return self.field._new(self.field.backend.powmod(self.value, exponent, self.field.p))
 
         def is_square(self):
-            """Legendre symbol of `self`."""
-            # TODO optimize the case (p,q) = (q,p) * something
-            if self.value == 0:
-                return True
-            else:
-                return self ** ((self.field.p-1) >> 1) == 1
+            """Quadratic residuosity of `self`.
+
+            The Legendre symbol is computed as a Jacobi symbol, using quadratic reciprocity
+            instead of an exponentiation to the power (p-1)/2.
+
+            """
+            return self.field.backend.jacobi(self.value, self.field.p) >= 0
 
         def __truediv__(self, other):
-            """Division of `self` by `other` modulo `self.field.p`."""
-            other = self._convert_to_element(other)
-            return self.field(self.value * invert(other.value, self.field.p))
+            """Division of `self` by `other` modulo `self.field.p`.
+
+            `Lazy` defines no division: with a `Lazy` operand on either side, the residue is reduced
+            and the quotient is a reduced `Element`.
+
+            """
+            field = self.field
+            if other.__class__ is not self.__class__:
+                other = self._convert_to_element(other)
+                if other is NotImplemented:
+                    return NotImplemented
+            return field._new(self.value * field.backend.invert(other.value, field.p) % field.p)
 
         def __repr__(self):
             return f"{self.value}"
 
         def sqrt(self):
-            """Square root of `self`.
+            """Square root of `self`, or `None` if `self` is not a square.
 
-            Computed using Tonelli-Shanks algorithm.
-            Assumes that `self` is a square.
-            Details here:
-            https://www.lvzl.fr/teaching/2020-21/docs/AA-devoir-1-sujet.pdf
-            https://en.wikipedia.org/wiki/Tonelli%E2%80%93Shanks_algorithm
+            Computed using Sarkar's table-based variant of Tonelli-Shanks algorithm, see `Field._sqrt_precomputation`.
+            Reference:
+            https://eprint.iacr.org/2020/1407.pdf
 
             """
+            root = self.field._sqrt_value(self.value)
+            return None if root is None else self.field._new(root)
+
+        def lazy(self, strict=False):
+            """Copy of `self` with lazy modular reduction, see `Field.Lazy`."""
+            element = _new_element(self.field.Strict if strict else self.field.Lazy)
+            element.value = self.value
+            element.field = self.field
+            return element
+
+    class Lazy(Element):
+        """Element with lazy modular reduction, for the evaluation of formulas.
+
+        Sums and differences are not reduced: `value` is any integer congruent to the element.
+        Products are reduced, and `reduce` returns the reduced `Element` when the result escapes
+        the formula. Each reduction increments `field.reductions`.
+        Being a subclass of `Element`, `Lazy` takes precedence in mixed operations.
 
-            if self.value == 0:
-                return self
-
-            if f_mod(self.field.p, 4) == 3:
-                # TODO ASSERT IS SQUARE BEFORE RETURN
-                return powmod(self.value, (self.field.p+1)//4, self.field.p)
-
-            # Tonelli-Shanks
-            z = self.field.non_square
-            M = self.field.two_adicity
-            Q = (self.field.p-1)//2**M
-
-            c = z**Q
-            t = self**Q
-            r = self**((Q+1) >> 1)
-            # TODO REMOVE THIS CHECK
-            assert (t**(1 << self.field.two_adicity) == 1)
-
-            while t != 1:
-                # Find the least i (0 < i < m) such that t^(2^i) ≡ 1 (mod p)
-                t2i = t
-                i = 0
-                while t2i != 1:
-                    t2i = t2i**2
-                    i += 1
-
-                # Update variables for the next iteration
-                b = c**(1 << (M-i-1))
-                M = i
-                c = b*b
-                t = t*c
-                r = r*b
-
-            return r if t == 1 else None
+        """
+        __slots__ = ()
+
+        def __eq__(self, other):
+            """Return the equality boolean between `self` and `other`."""
+            return self.reduce() == other
+
+        def __add__(self, other):
+            """Addition of `self` and `other`, without reduction."""
+            result = _new_element(self.__class__)
+            result.value = self.value + getattr(other, 'value', other)
+            result.field = self.field
+            return result
+
+        __radd__ = __add__
+
+        def __neg__(self):
+            """Negation of `self`, without reduction."""
+            result = _new_element(self.__class__)
+            result.value = -self.value
+            result.field = self.field
+            return result
+
+        def __sub__(self, other):
+            """Difference of `self` and `other`, without reduction."""
+            result = _new_element(self.__class__)
+            result.value = self.value - getattr(other, 'value', other)
+            result.field = self.field
+            return result
+
+        def __rsub__(self, other):
+            """Difference when `other` is given first, without reduction."""
+            result = _new_element(self.__class__)
+            result.value = getattr(other, 'value', other) - self.value
+            result.field = self.field
+            return result
+
+        def __mul__(self, other):
+            """Reduced multiplication of `self` and `other`."""
+            field = self.field
+            field.reductions += 1
+            result = _new_element(self.__class__)
+            result.value = self.value * getattr(other, 'value', other) % field.p
+            result.field = field
+            return result
+
+        __rmul__ = __mul__
+
+        def __pow__(self, exponent):
+            """Reduced power of `self` to a small non-negative `exponent`."""
+            field = self.field
+            field.reductions += 1
+            result = _new_element(self.__class__)
+            result.value = self.value ** exponent % field.p
+            result.field = field
+            return result
+
+        def reduce(self):
+            """Reduced `Element` equal to `self`."""
+            field = self.field
+            value = self.value
+            if not 0 <= value < field.p:
+                field.reductions += 1
+                value %= field.p
+            return field._new(value)
+
+    class Strict(Lazy):
+        """`Lazy` element reduced after every operation.
+
+        It counts in `field.reductions` the reductions done by the `Element` arithmetic.
+
+        """
+        __slots__ = ()
+
+        def _reduced(self):
+            field = self.field
+            field.reductions += 1
+            self.value %= field.p
+            return self
+
+        def __add__(self, other):
+            return Field.Lazy.__add__(self, other)._reduced()
+
+        __radd__ = __add__
+
+        def __neg__(self):
+            return Field.Lazy.__neg__(self)._reduced()
+
+        def __sub__(self, other):
+            return Field.Lazy.__sub__(self, other)._reduced()
+
+        def __rsub__(self, other):
+            return Field.Lazy.__rsub__(self, other)._reduced()
+
+
+class FieldVector:
+    """Vector of elements of a `Field`.
+
+    The elements are stored as a list of reduced residues, and the arithmetic is elementwise:
+    one Python call per vector instead of one per element. Scalars (elements or integers) are
+    broadcast to all the coordinates.
+
+    """
+    __slots__ = ('values', 'field')
+
+    def __init__(self, values, field):
+        p = field.p
+        integer = field.backend.integer
+        self.values = [value.value if isinstance(value, Field.Element) else integer(value) % p
+                       for value in values]
+        self.field = field
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        new = self.field._new
+        return (new(value) for value in self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.field._new_vector(self.values[index])
+        return self.field._new(self.values[index])
+
+    def __repr__(self):
+        return "[{}]".format(", ".join(str(value) for value in self.values))
+
+    def __eq__(self, other):
+        """Return the equality boolean between `self` and the vector `other`."""
+        if not isinstance(other, (FieldVector, list, tuple)) or len(other) != len(self):
+            return False
+        return self.values == self._operand(other)
+
+    def _operand(self, other):
+        """Residues of `other`: a list for a vector, a single residue for a scalar."""
+        if isinstance(other, (list, tuple)):
+            other = FieldVector(other, self.field)
+        if isinstance(other, FieldVector):
+            if len(other.values) != len(self.values):
+                raise ValueError("vectors of different lengths")
+            return other.values
+        if isinstance(other, Field.Element):
+            return other.value
+        return self.field.backend.integer(other) % self.field.p
+
+    def __add__(self, other):
+        """Elementwise addition of `self` and `other`."""
+        p = self.field.p
+        other = self._operand(other)
+        if isinstance(other, list):
+            return self.field._new_vector([(a + b) % p for a, b in zip(self.values, other)])
+        return self.field._new_vector([(a + other) % p for a in self.values])
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        """Elementwise negation of `self`."""
+        p = self.field.p
+        return self.field._new_vector([p - a if a else a for a in self.values])
+
+    def __sub__(self, other):
+        """Elementwise difference of `self` and `other`."""
+        p = self.field.p
+        other = self._operand(other)
+        if isinstance(other, list):
+            return self.field._new_vector([(a - b) % p for a, b in zip(self.values, other)])
+        return self.field._new_vector([(a - other) % p for a in self.values])
+
+    def __rsub__(self, other):
+        """Elementwise difference when `other` is given first."""
+        return -self + other
+
+    def __mul__(self, other):
+        """Elementwise multiplication of `self` and `other`."""
+        p = self.field.p
+        other = self._operand(other)
+        if isinstance(other, list):
+            return self.field._new_vector([a * b % p for a, b in zip(self.values, other)])
+        return self.field._new_vector([a * other % p for a in self.values])
+
+    __rmul__ = __mul__
+
+    def square(self):
+        """Elementwise square of `self`."""
+        p = self.field.p
+        return self.field._new_vector([a * a % p for a in self.values])
+
+    def inverse(self):
+        """Elementwise inverse of `self` with a single field inversion, zeros are left unchanged."""
+        return self.field._new_vector(self.field._batch_invert_values(self.values))
+
+    def __truediv__(self, other):
+        """Elementwise division of `self` by `other`."""
+        other = self._operand(other)
+        if isinstance(other, list):
+            return self * self.field._new_vector(other).inverse()
+        return self * self.field.backend.invert(other, self.field.p)
+
+    def to_bytes(self, out=None, offset=0):
+        """Fixed-width little-endian encoding of the elements of `self`, `field.byte_length` bytes each.
+
+        The records are written at `offset` in the writable buffer `out` (`bytearray`, `memoryview`,
+        writable `mmap`...), or in a new `bytearray` if `out` is None. Returns the buffer.
+        See `Field.vector_from_bytes` for the decoding.
+
+        """
+        width = self.field.byte_length
+        size = len(self.values) * width
+        if out is None:
+            out = bytearray(size)
+        view = memoryview(out).cast("B")
+        if len(view) < offset + size:
+            raise ValueError("Buffer too small for {} records of {} bytes".format(len(self.values), width))
+        view[offset:offset+size] = b"".join([int(a).to_bytes(width, "little") for a in self.values])
+        return out
+
+    def is_square(self):
+        """Quadratic residuosity of all the elements of `self`, as a list of booleans."""
+        p = self.field.p
+        jacobi = self.field.backend.jacobi
+        return [jacobi(a, p) >= 0 for a in self.values]
+
+    def sqrt(self):
+        """Elementwise square root of `self`.
+
+        Returns a pair `(roots, squares)` where `squares` is the list of quadratic residuosity booleans.
+        The non-squares have no root: the corresponding coordinates of `roots` are set to zero.
+
+        """
+        sqrt_value = self.field._sqrt_value
+        p = self.field.p
+        jacobi = self.field.backend.jacobi
+        roots = []
+        squares = []
+        for a in self.values:
+            # the Jacobi symbol rejects non-squares before the exponentiation
+            root = sqrt_value(a) if jacobi(a, p) >= 0 else None
+            roots.append(0 if root is None else root)
+            squares.append(root is not None)
+        return self.field._new_vector(roots), squares
+
+
+_new_element = object.__new__
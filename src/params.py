@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Bandersnatch parameters, with precomputed constants and memoized curve objects.
+
+The curves are built at the first call and cached, so that importing this module is cheap:
+>>> from src import params
+>>> E = params.edwards()
+>>> params.edwards() is E
+True
+
+Reference:
+https://eprint.iacr.org/2021/1152.pdf
+
+"""
+from src.backend import get_backend
+from src.field import Field
+from src.curve.edwards import Edwards
+from src.curve.montgomery import Montgomery
+
+# Base field: the scalar field of BLS12-381
+P = 0x73eda753299d7d483339d80809a1d80553bda402fffe5bfeffffffff00000001
+# p - 1 = 2^32 * q with q odd
+TWO_ADICITY = 32
+# Smallest quadratic non-residue
+NON_SQUARE = 5
+
+# Order of the prime subgroup and cofactor
+R = 0x1cfb69d4ca675f520cce760202687600ff8f87007419047174fd06b52876e7e1
+H = 4
+
+# Twisted Edwards model: a*x^2 + y^2 = 1 + d*x^2*y^2
+EDWARDS_A = P - 5
+EDWARDS_D = 0x6389c12633c267cbc66e3bf86be3b6d8cb66677177e54f92b369f2f5188d58e7
+
+# Montgomery model: b*y^2 = x^3 + a*x^2 + x
+MONTGOMERY_A = 0x4247698f4e32ad45a293959b4ca17afa4a2d2317e4c6ce5023e1fd63d1b5de98
+MONTGOMERY_B = 5
+
+
+# Memoized objects, keyed by (constructor, backend name, options)
+_cache = {}
+
+
+def _memoized(key, constructor):
+    if key not in _cache:
+        _cache[key] = constructor()
+    return _cache[key]
+
+
+def field(backend=None):
+    """Base field of Bandersnatch, with the arithmetic `backend` (see `src/backend.py`)."""
+    backend = get_backend(backend)
+    return _memoized(("field", backend.name),
+                     lambda: Field(P, backend, two_adicity=TWO_ADICITY, non_square=NON_SQUARE))
+
+
+def edwards(backend=None, lazy=False):
+    """Bandersnatch in twisted Edwards model, see `Edwards`."""
+    F = field(backend)
+    return _memoized(("edwards", F.backend.name, lazy),
+                     lambda: Edwards(F(EDWARDS_A), F(EDWARDS_D), R, H, lazy=lazy))
+
+
+def montgomery(backend=None, lazy=False):
+    """Bandersnatch in Montgomery model, see `Montgomery`."""
+    F = field(backend)
+    return _memoized(("montgomery", F.backend.name, lazy),
+                     lambda: Montgomery(F(MONTGOMERY_A), F(MONTGOMERY_B), R, H, lazy=lazy))
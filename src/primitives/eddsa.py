@@ -34,7 +34,7 @@ class EdDSA:
         a = int.from_bytes(h[:32], "little")
         a &= (1 << 254) - 8
         a |= (1 << 254)
-        return (a * self.curve.generator).encode_base(256)
+        return self.curve.fixed_base_mul(a).encode_base(256)
 
     def sign(self, msg):
         """Signature of a message.
@@ -47,10 +47,10 @@ class EdDSA:
         a &= (1 << 254) - 8  # ensure no multiple of 4
         a |= (1 << 254)
         prefix = h[32:]
-        A = (a*self.curve.generator).encode_base(256)
+        A = self.curve.fixed_base_mul(a).encode_base(256)
         r = int.from_bytes(hashlib.sha512(
             prefix + str.encode(msg)).digest(), "little") % self.curve.r
-        R = r * self.curve.generator
+        R = self.curve.fixed_base_mul(r)
         Rs = R.encode_base(256)
         h = int.from_bytes(hashlib.sha512(
             Rs+A+str.encode(msg)).digest(), "little") % self.curve.r
@@ -68,11 +68,13 @@ class EdDSA:
         if len(signature) != 64:
             Exception("Bad signature length")
         A = self.curve.decode_base(self.public_key, 256)
-        if not A:
+        # (None, None) for an invalid encoding
+        if isinstance(A, tuple):
             return False
         Rs = signature[:32]
         R = self.curve.decode_base(Rs, 256)
-        if not R:
+        # (None, None) for an invalid encoding
+        if isinstance(R, tuple):
             return False
         s = int.from_bytes(signature[32:], "little")
         if s >= self.curve.r:
@@ -19,10 +19,9 @@ class xECDH:
         return random.randint(1, self.curve.r - 1)
 
     def generate_public_key(self):
-        """Generates the public key using the generator."""
-        return self.private_key * self.curve.generator
+        """Generates the public key using the generator and its precomputed tables."""
+        return self.curve.fixed_base_mul(self.private_key)
 
     def compute_shared_secret(self, other_public_key):
-        """Compute the shared secret `secret_key` * `other_public_key`."""
-        shared_secret = self.private_key * other_public_key
-        return shared_secret
+        """Compute the shared secret `secret_key` * `other_public_key` with the ladder of RFC 7748."""
+        return other_public_key.mul_rfc_7748(self.private_key)
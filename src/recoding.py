@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Signed recodings of scalars for the scalar multiplications.
+
+Reference:
+D. Hankerson, A. Menezes, S. Vanstone, Guide to Elliptic Curve Cryptography, section 3.3.
+
+"""
+
+
+def wnaf(k, width):
+    """Width-`width` non-adjacent form of the integer `k` (wNAF).
+
+    Returns the digits d_i, least significant first, with k = ∑ d_i 2^i. The nonzero digits are
+    odd with |d_i| < 2^(width-1), and among any `width` consecutive digits at most one is nonzero:
+    the average density of nonzero digits is 1/(width+1). `width` = 2 gives the NAF.
+    Reference: Guide to Elliptic Curve Cryptography, algorithm 3.35.
+
+    """
+    if width < 2:
+        raise ValueError("The width of a wNAF is at least 2")
+    k = int(k)
+    mask = (1 << width) - 1
+    half = 1 << (width-1)
+    digits = []
+    while k != 0:
+        if k & 1:
+            digit = k & mask
+            if digit >= half:
+                digit -= 1 << width
+            k -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        k >>= 1
+    return digits
+
+
+def joint_wnaf(scalars, width):
+    """wNAF of all the `scalars`, padded with zeros to the same length.
+
+    `width` is the width of all the wNAF, or the list of the widths for each scalar.
+
+    Returns a list of columns: the tuple of the i-th digits of the scalars, least significant first.
+    This is the recoding of the interleaved (Straus) multi-scalar multiplication, where the
+    doublings are shared and each point uses its own table of odd multiples.
+
+    """
+    widths = width if isinstance(width, (list, tuple)) else [width] * len(scalars)
+    digits = [wnaf(k, w) for k, w in zip(scalars, widths)]
+    length = max((len(d) for d in digits), default=0)
+    return list(zip(*[d + [0] * (length - len(d)) for d in digits]))
+
+
+def weight(digits):
+    """Number of nonzero digits, i.e. of point additions, of a recoding."""
+    return sum(1 for d in digits if d != 0)
+
+
+def signed_windows(k, width):
+    """Signed digits of the integer `k` ≥ 0 in base 2^`width`, least significant first.
+
+    The digits satisfy -2^(width-1) < d_i ≤ 2^(width-1) and k = ∑ d_i 2^(i*width): there are
+    2^(width-1) nonzero absolute values, half as many as with unsigned windows.
+
+    """
+    k = int(k)
+    mask = (1 << width) - 1
+    half = 1 << (width-1)
+    digits = []
+    while k != 0:
+        digit = k & mask
+        k >>= width
+        if digit > half:
+            digit -= 1 << width
+            k += 1
+        digits.append(digit)
+    return digits
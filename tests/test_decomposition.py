@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import unittest
+from random import randint
+from src.decomposition import GLVDecomposition, M1, M2, M3, LAMBDA
+
+r = 0x1cfb69d4ca675f520cce760202687600ff8f87007419047174fd06b52876e7e1
+
+
+class TestDecomposition(unittest.TestCase):
+
+    def test_lattice(self):
+        """The basis ((M1, M2), (M3, -M1)) generates the lattice of λ, of determinant -r"""
+        self.assertEqual((M1 + LAMBDA * M2) % r, 0)
+        self.assertEqual((M3 - LAMBDA * M1) % r, 0)
+        self.assertEqual(M1 * M1 + M2 * M3, r)
+
+    def test_decompose(self):
+        """k = k1 + λ*k2 mod r with bounded half-scalars, for both signs of λ"""
+        for sign in [1, -1]:
+            decomposition = GLVDecomposition(r, sign * M1, M2, M3)
+            scalars = [0, 1, r - 1, r, r + 1, -1, -r, r // 2, 2**256 - 1, M1, M2, M3]
+            scalars += [randint(-r, 2*r) for _ in range(200)]
+            for k in scalars:
+                k1, k2 = decomposition.decompose(k)
+                self.assertEqual((k1 + sign * LAMBDA * k2 - k) % r, 0)
+                self.assertLessEqual(abs(k1), decomposition.bound)
+                self.assertLessEqual(abs(k2), decomposition.bound)
+            self.assertLessEqual(decomposition.bound.bit_length(), 127)
+            self.assertEqual(decomposition.decompose(r), (0, 0))
+            self.assertEqual(decomposition.batch_decompose(scalars),
+                             [decomposition.decompose(k) for k in scalars])
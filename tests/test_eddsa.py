@@ -27,3 +27,12 @@ class TestEdDSA(unittest.TestCase):
         bob = self.set_up_eddsa()
         sig_2 = bob.sign("Boa noite")
         assert bob.verify("Boa noite", sig_2)
+
+    def test_verify_invalid_encoding(self):
+        """An encoding of R with y² = a/d is rejected without exception"""
+        alice = self.set_up_eddsa(secret=b"Que boludo... my llave es fija!!")
+        sig = alice.sign("Buenas che")
+        E = alice.curve
+        y = (E.a/E.d).sqrt()
+        self.assertFalse(alice.verify("Buenas che", int(y.value).to_bytes(32, "little") + sig[32:]))
+        self.assertFalse(alice.verify("Buenas che", bytes(31) + b"\x80" + sig[32:]))
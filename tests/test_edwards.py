@@ -44,17 +44,177 @@ class TestEdwards(unittest.TestCase):
             p = E.random().naive_mul(E.h)
             self.assertTrue(p.is_prime_order(E.r))
 
+    def test_random_batch(self):
+        """Random points are on the curve and reproducible with a seed"""
+        E, test_vectors = self.set_up_curve()
+        points = E.random_batch(10, seed=1)
+        self.assertEqual(len(points), 10)
+        for p in points:
+            x, y = p.x, p.y
+            self.assertEqual(E.a*x**2 + y**2, 1 + E.d*x**2*y**2)
+        self.assertEqual(points, E.random_batch(10, seed=1))
+
+    def test_batch_normalize_encode(self):
+        """Batch normalization and encoding match the point by point versions"""
+        E, test_vectors = self.set_up_curve()
+        points = [test_vectors['p'].dbl(), test_vectors['q'] + test_vectors['p'], E.generator, E(0, 1, 1), E(1, 0, 0)]
+        normalized = E.batch_normalize(points)
+        self.assertEqual(normalized, points)
+        self.assertEqual([p.z for p in normalized], [1, 1, 1, 1, 0])
+        self.assertEqual([(p.x, p.y) for p in normalized[:4]], [(p.normalize().x, p.normalize().y) for p in points[:4]])
+        self.assertEqual(E.batch_encode(points[:4], 256), [p.encode_base(256) for p in points[:4]])
+        self.assertEqual(E.batch_encode([], 256), [])
+        # points at infinity have no encoding
+        with self.assertRaises(ValueError):
+            E.batch_encode(points, 256)
+        with self.assertRaises(ValueError):
+            E.encode_array(points[3:], 256)
+        with self.assertRaises(ValueError):
+            E.point_batch(points).encode(256)
+
+    def test_encode_decode_array(self):
+        """Bulk encoding matches `encode_base` and round-trips"""
+        E, test_vectors = self.set_up_curve()
+        points = [test_vectors['p'], test_vectors['q'], E.generator, E(0, 1, 1)]
+        data = E.encode_array(points, 256)
+        self.assertEqual(bytes(data), b"".join(bytes(p.encode_base(256)) for p in points))
+        self.assertEqual(E.decode_array(data, 256), points)
+        out = bytearray(1 + len(data))
+        E.encode_array(points, 256, out, offset=1)
+        self.assertEqual(E.decode_array(out, 256, offset=1, n=2), points[:2])
+        self.assertEqual(E.decode_array(b"\xff" * 32, 256), [(None, None)])
+
+    def test_point_batch(self):
+        """The operations of `PointBatch` match those of `Point`"""
+        E, test_vectors = self.set_up_curve()
+        points = [test_vectors['p'].dbl(), test_vectors['q'], E.generator, E(0, 1, 1), E(0, -1, 1)]
+        others = [test_vectors['q'].dbl(), E(0, 1, 1), E.generator.dbl(), test_vectors['p'], E(0, -1, 1)]
+        batch, other = E.point_batch(points), E.point_batch(others)
+        self.assertEqual(len(batch), 5)
+        self.assertEqual(list(batch), points)
+        self.assertEqual(list(batch + other), [p + q for p, q in zip(points, others)])
+        self.assertEqual(list(batch.dbl()), [p.dbl() for p in points])
+        self.assertEqual(list(batch.neg()), [p.neg() for p in points])
+        self.assertEqual([p.z for p in batch.normalize()], [1] * 5)
+        self.assertEqual(batch.normalize(), batch)
+        self.assertNotEqual(batch, other)
+        self.assertEqual(bytes(batch.encode(256)), bytes(E.encode_array(points, 256)))
+        infinity = E.point_batch([E(1, 0, 0), E(0, 1, 0)])
+        self.assertEqual(list(infinity.dbl()), [E(0, 1, 1)] * 2)
+        self.assertEqual(list(infinity.normalize()), [E(1, 0, 0), E(0, 1, 0)])
+        with self.assertRaises(ValueError):
+            batch.add(infinity)
+
+    def test_ladder_mul(self):
+        """Scalar multiplication on the Montgomery ladder with y-coordinate recovery matches the Edwards one"""
+        E, test_vectors = self.set_up_curve()
+        p, k = test_vectors['p'], test_vectors['k']
+        self.assertEqual(p.ladder_mul(k), test_vectors['k_times_p'])
+        self.assertEqual(p.ladder_mul(-k), test_vectors['k_times_p'].neg())
+        for k in [0, 1, 2, E.r - 1, E.r, E.r + 1, 2**300 + 1]:
+            self.assertEqual(p.ladder_mul(k), p.naive_mul(k))
+        # points out of the subgroup of order r
+        small_p = test_vectors['small_p']
+        self.assertEqual(small_p.ladder_mul(E.r), E(0, -1, 1))
+        self.assertEqual(small_p.ladder_mul(k), small_p.naive_mul(k))
+        self.assertEqual(E(0, -1, 1).ladder_mul(k), E(0, -1, 1) if k % 2 else E(0, 1, 1))
+        self.assertEqual(E(0, 1, 1).ladder_mul(k), E(0, 1, 1))
+
+    def test_montgomery_maps(self):
+        """The birational maps between the Edwards and the Montgomery models, single and batched"""
+        E, test_vectors = self.set_up_curve()
+        M = E.montgomery()
+        self.assertIs(M.edwards(), E)
+        self.assertTrue(M.generator.in_curve())
+        self.assertIn(M.generator.to_edwards(), [E.generator, E.generator.neg()])
+        points = E.random_batch(6, seed=0) + [test_vectors['small_p'], E(0, 1, 1), E(0, -1, 1)]
+        images = E.batch_to_montgomery(points)
+        self.assertEqual(images, [p.to_montgomery() for p in points])
+        self.assertEqual(images[-2].z, 0)
+        # the x-only points are defined modulo {±1}
+        for p, q in zip(points, M.batch_to_edwards(images)):
+            self.assertIn(q, [p, p.neg()])
+        self.assertEqual([q.to_edwards() for q in images], M.batch_to_edwards(images))
+        k = test_vectors['k']
+        self.assertEqual(points[0].to_montgomery().mul_rfc_7748(k), points[0].ladder_mul(k).to_montgomery())
+        # u = -1 is not on the curve
+        self.assertEqual(M.batch_to_edwards([M(-1, 1), images[0]])[0], None)
+
+    def test_batch_decode(self):
+        """Batch decoding matches `decode_base` and reports invalid encodings per index"""
+        E, test_vectors = self.set_up_curve()
+        points = E.random_batch(8, seed=0) + [E(0, 1, 1), E(0, -1, 1)]
+        encodings = [bytes(p.encode_base(256)) for p in points]
+        self.assertEqual(E.batch_decode(encodings, 256), [E.decode_base(s, 256) for s in encodings])
+        self.assertEqual(E.batch_decode(encodings, 256), points)
+        # wrong length, y ≥ p, x = 0 with the sign bit set, and y² = a/d
+        y = (E.a/E.d).sqrt()
+        invalid = [encodings[0][:31], int(E.field.p).to_bytes(32, "little"), bytes(31) + b"\x80",
+                   int(y.value).to_bytes(32, "little")]
+        decoded = E.batch_decode(invalid[:2] + encodings[:1] + invalid[2:], 256)
+        self.assertEqual(decoded, [(None, None), (None, None), points[0], (None, None), (None, None)])
+        # the single decoder rejects the same encodings
+        self.assertEqual([E.decode_base(s, 256) for s in invalid], [(None, None)] * 4)
+        self.assertEqual(E.batch_decode([], 256), [])
+
     def test_is_prime_order(self):
         """p is of prime order r"""
         E, test_vectors = self.set_up_curve()
         self.assertTrue(test_vectors['p'].is_prime_order(E.r))
 
+    def test_in_prime_subgroup(self):
+        """The endomorphism test agrees with the multiplication by r"""
+        E, test_vectors = self.set_up_curve()
+        points = E.random_batch(20, seed=0)
+        expected = [p.is_prime_order(E.r) for p in points]
+        self.assertEqual([p.in_prime_subgroup() for p in points], expected)
+        self.assertIn(False, expected)
+        self.assertIn(True, expected)
+        # the generator plus each point of order 2
+        torsion = [E(0, -1, 1), E(1, 0, 0), E(0, 1, 0)]
+        g = test_vectors['p']
+        self.assertTrue(g.in_prime_subgroup())
+        self.assertTrue(E(0, 1, 1).in_prime_subgroup())
+        self.assertEqual([(g + t).in_prime_subgroup() for t in torsion], [False] * 3)
+        self.assertEqual(E.batch_in_prime_subgroup(points + torsion + [g]), expected + [False] * 3 + [True])
+
     def test_φ_norm(self):
         """φ²(p) = [-2]p"""
         E, test_vectors = self.set_up_curve()
         φ2_p = test_vectors['p'].φ().φ()
         self.assertEqual(φ2_p, test_vectors['p'].dbl().neg())
 
+    def test_values_kernels(self):
+        """The kernels on residues match the formulas on field elements"""
+        E, test_vectors = self.set_up_curve()
+        lazy = Edwards(E.a, E.d, E.r, E.h, lazy=True)
+        p, q = test_vectors['p'].dbl(), test_vectors['q'].dbl()
+        p_lazy, q_lazy = lazy(p.x, p.y, p.z), lazy(q.x, q.y, q.z)
+        self.assertEqual(p.dbl(), p_lazy.dbl())
+        self.assertEqual(p.add(q), p_lazy.add(q_lazy))
+        self.assertEqual(p.add(E(0, 1, 1)), p)
+        self.assertEqual(E(0, 1, 1).add(p), p)
+        self.assertEqual(E(0, -1, -1).dbl(), E(0, 1, 1))
+        self.assertEqual(E(1, 0, 0).dbl(), E(0, 1, 1))
+        k = randint(0, E.r)
+        self.assertEqual(p.glv(k), p_lazy.glv(k))
+        self.assertEqual(p.naive_mul(k), p_lazy.naive_mul(k))
+        self.assertEqual(p.multi_scalar_mul_2(k, q, -k), p_lazy.multi_scalar_mul_2(k, q_lazy, -k))
+        k1, k2, k3, k4 = [randint(-2**127, 2**127) for _ in range(4)]
+        self.assertEqual(p.multi_scalar_mul_4(k1, p.φ(), k2, q, k3, q.φ(), k4),
+                         p_lazy.multi_scalar_mul_4(k1, p_lazy.φ(), k2, q_lazy, k3, q_lazy.φ(), k4))
+
+    def test_φ_extended(self):
+        """φ in extended coordinates matches the projective φ, with lazy reduction too"""
+        E, test_vectors = self.set_up_curve()
+        for p in [test_vectors['p'], test_vectors['q'].dbl(), E(0, -1, 1)]:
+            φ_p = p.extended().φ()
+            self.assertEqual(φ_p.projective(), p.φ())
+            self.assertEqual(φ_p.x * φ_p.y, φ_p.t * φ_p.z)
+        lazy = Edwards(E.a, E.d, E.r, E.h, lazy=True)
+        p = test_vectors['p']
+        self.assertEqual(lazy(p.x, p.y, p.z).φ(), p.φ())
+
     def test_φ_eigenvalue(self):
         """φ=[λ] on the <p> eigen-space"""
         E, test_vectors = self.set_up_curve()
@@ -86,6 +246,95 @@ class TestEdwards(unittest.TestCase):
         p = test_vectors['p']
         self.assertEqual(p.dbl(), p+p)
 
+    def test_lazy_reduction(self):
+        """dbl and add with lazy reduction, and their number of reductions"""
+        E, test_vectors = self.set_up_curve()
+        E_lazy = Edwards(E.a, E.d, E.r, E.h, lazy=True)
+        p = E_lazy(test_vectors['p'].x, test_vectors['p'].y, test_vectors['p'].z)
+        q = E_lazy(test_vectors['q'].x, test_vectors['q'].y, test_vectors['q'].z)
+        self.assertEqual(p.dbl(), test_vectors['p_double'])
+        self.assertEqual(p + q, test_vectors['p_plus_q'])
+        self.assertEqual(p.glv(test_vectors['k']), test_vectors['k_times_p'])
+        for eager, lazy in p.reduction_counts(q).values():
+            self.assertLess(lazy, eager)
+
+    def test_extended(self):
+        """Extended coordinates match the projective arithmetic"""
+        E, test_vectors = self.set_up_curve()
+        p = test_vectors['p']
+        q = test_vectors['q'].dbl()
+        p_ext, q_ext = p.extended(), q.extended()
+        self.assertEqual(p_ext.projective(), p)
+        self.assertEqual(p_ext.dbl().projective(), test_vectors['p_double'])
+        self.assertEqual(p_ext.add(q_ext).projective(), p + q)
+        self.assertEqual(p_ext.madd(q.normalize().extended()).projective(), p + q)
+        self.assertEqual(p_ext.add(p_ext.neg()).projective(), E(0, 1, 1))
+        self.assertEqual(p_ext.add(E(0, 1, 1).extended()), p_ext)
+        with self.assertRaises(ValueError):
+            E(1, 0, 0).extended()
+
+    def test_extended_scalar_mul(self):
+        """Scalar multiplications in extended and projective coordinates"""
+        E, test_vectors = self.set_up_curve()
+        E_projective = Edwards(E.a, E.d, E.r, E.h, extended=False)
+        p, q, k = test_vectors['p'], test_vectors['q'], test_vectors['k']
+        p_projective = E_projective(p.x, p.y, p.z)
+        q_projective = E_projective(q.x, q.y, q.z)
+        self.assertEqual(p_projective.glv(k), test_vectors['k_times_p'])
+        self.assertEqual(p_projective.naive_mul(k), test_vectors['k_times_p'])
+        self.assertEqual(p.multi_scalar_mul_4(3, q, -5, p, 7, q, 0),
+                         p_projective.multi_scalar_mul_4(3, q_projective, -5, p_projective, 7, q_projective, 0))
+        self.assertEqual(p.naive_mul(-k), test_vectors['k_times_p'].neg())
+
+    def test_glv_width(self):
+        """GLV with all the wNAF widths"""
+        E, test_vectors = self.set_up_curve()
+        E_projective = Edwards(E.a, E.d, E.r, E.h, extended=False)
+        p = test_vectors['p']
+        p_projective = E_projective(p.x, p.y, p.z)
+        for width in range(2, 8):
+            self.assertEqual(p.glv(test_vectors['k'], width), test_vectors['k_times_p'])
+            self.assertEqual(p_projective.glv(test_vectors['k'], width), test_vectors['k_times_p'])
+        for k in [1, 2, 3, -1, E.r - 1]:
+            self.assertEqual(p.glv(k), p.naive_mul(k))
+
+    def test_msm(self):
+        """Pippenger multi-scalar multiplication matches a sum of scalar multiplications"""
+        E, test_vectors = self.set_up_curve()
+        E_projective = Edwards(E.a, E.d, E.r, E.h, extended=False)
+        points = [E.fixed_base_mul(randint(0, E.r)) for _ in range(20)]
+        scalars = [randint(-E.r, E.r) for _ in range(20)] + [0]
+        points.append(test_vectors['p'])
+        expected = E(0, 1, 1)
+        for p, k in zip(points, scalars):
+            expected += p.glv(k)
+        self.assertEqual(E.msm(points, scalars), expected)
+        self.assertEqual(E.msm(points, scalars, endomorphism=True), expected)
+        self.assertEqual(E_projective.msm([E_projective(p.x, p.y, p.z) for p in points], scalars), expected)
+        E_lazy = Edwards(E.a, E.d, E.r, E.h, lazy=True)
+        self.assertEqual(E_lazy.msm([E_lazy(p.x, p.y, p.z) for p in points], scalars), expected)
+        self.assertEqual(E.msm([test_vectors['p']], [test_vectors['k']]), test_vectors['k_times_p'])
+        self.assertEqual(E.msm([], []), E(0, 1, 1))
+        self.assertEqual(E.msm(points[:2], [0, 0]), E(0, 1, 1))
+        with self.assertRaises(ValueError):
+            E.msm(points, scalars[:-1])
+
+    def test_glv_edge_cases(self):
+        """GLV with scalars that are not reduced modulo r"""
+        E, test_vectors = self.set_up_curve()
+        p = test_vectors['p']
+        for k in [E.r, -E.r, E.r + 5, -1, 2 * E.r - 1, 2**256 - 1]:
+            self.assertEqual(p.glv(k), p.naive_mul(k % E.r))
+
+    def test_fixed_base_mul(self):
+        """Fixed-base multiplication of the generator"""
+        E, test_vectors = self.set_up_curve()
+        g = E.generator
+        k = test_vectors['k']
+        for window in [1, 4, 6]:
+            for scalar in [0, 1, 2, k, -k, E.r - 1, E.r, 2**255 - 1]:
+                self.assertEqual(E.fixed_base_mul(scalar, window), g.naive_mul(scalar % E.r))
+
     def test_neg(self):
         """p + (-p) = 0"""
         E, test_vectors = self.set_up_curve()
@@ -132,6 +381,17 @@ class TestEdwards(unittest.TestCase):
                 tmp1 = p.multi_scalar_mul_2(k1, q, k2)
                 self.assertEqual(tmp1, p.naive_mul(k1) + q.naive_mul(k2))
 
+    def test_multi_scalar_mul_4_width(self):
+        """Interleaved windows with all the widths, and the cached tables of the generator"""
+        E, test_vectors = self.set_up_curve()
+        p, q, g = test_vectors['p'], test_vectors['q'], E.generator
+        k = [randint(-2**128, 2**128) for _ in range(4)]
+        expected = E._multi_scalar_mul([p, q, g, p.dbl()], k)
+        for width in range(2, 8):
+            self.assertEqual(p.multi_scalar_mul_4(k[0], q, k[1], g, k[2], p.dbl(), k[3], width), expected)
+        k, l = randint(0, E.r), randint(0, E.r)
+        self.assertEqual(g.multi_scalar_mul_2(k, p, l), g.naive_mul(k) + p.naive_mul(l))
+
     def test_glv(self):
         """GLV technique for k*p from test vectors"""
         E, test_vectors = self.set_up_curve()
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from src.field import Field
+from src.backend import BACKENDS
 import unittest
 
 
@@ -28,6 +29,25 @@ class TestField(unittest.TestCase):
         b = F.random()
         self.assertFalse(a == b)
 
+    def test_random_batch(self):
+        """Random vectors are reproducible with a seed"""
+        F, test_vectors = self.set_up_field()
+        u = F.random_batch(10, seed=12345)
+        self.assertEqual(len(u), 10)
+        self.assertTrue(all(0 <= value < F.p for value in u.values))
+        self.assertEqual(u, F.random_batch(10, seed=12345))
+        self.assertFalse(u == F.random_batch(10, seed=54321))
+        self.assertFalse(u == F.random_batch(10))
+        self.assertEqual(len(F.random_batch(0)), 0)
+
+    def test_seed(self):
+        """Reseeding reproduces the sequence of random elements"""
+        F, test_vectors = self.set_up_field()
+        F.seed(42)
+        a = [F.random() for _ in range(3)]
+        F.seed(42)
+        self.assertEqual(a, [F.random() for _ in range(3)])
+
     def test_mul(self):
         """a*b from test vectors"""
         F, test_vectors = self.set_up_field()
@@ -53,9 +73,178 @@ class TestField(unittest.TestCase):
         self.assertTrue(
             root == test_vectors['sqrt_b'] or root == -test_vectors['sqrt_b'])
 
+    def test_sqrt_non_square(self):
+        """The square root of a non-square is `None`"""
+        F, test_vectors = self.set_up_field()
+        self.assertIsNone(test_vectors['non_square'].sqrt())
+        self.assertIsNone((test_vectors['b'] * F.non_square).sqrt())
+        self.assertEqual(F(0).sqrt(), 0)
+
+    def test_sqrt_small_fields(self):
+        """Square roots of all the elements of fields of various 2-adicities"""
+        for p in [13, 97, 103, 7681]:
+            F = Field(p)
+            for i in range(p):
+                root = F(i).sqrt()
+                if F(i).is_square():
+                    self.assertIsInstance(root, Field.Element)
+                    self.assertEqual(root*root, F(i))
+                else:
+                    self.assertIsNone(root)
+
+    def test_sqrt_ratio(self):
+        """sqrt(u/v) computed with one inversion on the residues"""
+        F, test_vectors = self.set_up_field()
+        a = test_vectors['a']
+        b = test_vectors['b']
+        root = F.sqrt_ratio(b*a, a)
+        self.assertEqual(root*root, b)
+        self.assertIsNone(F.sqrt_ratio(b*F.non_square*a, a))
+        self.assertEqual(F.sqrt_ratio(0, a), 0)
+        with self.assertRaises(ZeroDivisionError):
+            F.sqrt_ratio(a, 0)
+
     def test_is_square(self):
         """Legendre symbol test on small squares and a non-square"""
         F, test_vectors = self.set_up_field()
         self.assertFalse(test_vectors['non_square'].is_square())
         for i in range(F.non_square.value):
             self.assertTrue(F(i).is_square())
+
+    def test_lazy_mixed(self):
+        """Mixed arithmetic of `Element` and `Lazy` operands works in both directions"""
+        F, test_vectors = self.set_up_field()
+        a = test_vectors['a']
+        b = test_vectors['b']
+        # unreduced residue of b
+        b_lazy = b.lazy() + F.p
+        for x, y in [(a, b_lazy), (a.lazy(), b), (a.lazy(), b_lazy)]:
+            self.assertEqual(x / y, test_vectors['a_div_b'])
+            self.assertEqual(y / x, b / a)
+            self.assertEqual(x * y, test_vectors['a_mul_b'])
+            self.assertEqual(x + y, a + b)
+            self.assertEqual(x - y, a - b)
+        self.assertIs((a / b_lazy).__class__, Field.Element)
+        self.assertLess((b_lazy / a).value, F.p)
+
+    def test_slots(self):
+        """Elements do not carry a per-instance `__dict__`"""
+        F, test_vectors = self.set_up_field()
+        self.assertFalse(hasattr(test_vectors['a'], '__dict__'))
+
+    def test_reduced_results(self):
+        """Results of the arithmetic stay in [0, p)"""
+        F, test_vectors = self.set_up_field()
+        self.assertEqual((F(-1) + 1).value, 0)
+        self.assertEqual((F(0) - 1).value, F.p - 1)
+        self.assertEqual((-F(0)).value, 0)
+        self.assertEqual((-F(1)).value, F.p - 1)
+        self.assertEqual(3 - F(5), F(-2))
+        self.assertEqual(F._new(F.p - 1) * F(-1), 1)
+
+    def test_batch_invert(self):
+        """Batch inversion matches element-wise inversion and leaves zeros unchanged"""
+        F, test_vectors = self.set_up_field()
+        elements = [test_vectors['a'], F(0), test_vectors['b'], F(1), F(0)]
+        inverses = F.batch_invert(elements)
+        self.assertEqual(len(inverses), len(elements))
+        for element, inverse in zip(elements, inverses):
+            if element == 0:
+                self.assertEqual(inverse, 0)
+            else:
+                self.assertEqual(inverse, F(1)/element)
+        self.assertEqual(F.batch_invert([]), [])
+        self.assertEqual(F.batch_invert([F(0)]), [0])
+
+    def test_is_square_euler(self):
+        """Legendre symbol agrees with Euler's criterion"""
+        F, test_vectors = self.set_up_field()
+        for _ in range(20):
+            a = F.random()
+            self.assertEqual(a.is_square(), a ** ((F.p-1) >> 1) == 1)
+
+    def test_batch_is_square(self):
+        """Batch quadratic residuosity matches `is_square`"""
+        F, test_vectors = self.set_up_field()
+        elements = [test_vectors['a'], test_vectors['b'], test_vectors['non_square'], F(0), F.random()]
+        self.assertEqual(F.batch_is_square(elements), [e.is_square() for e in elements])
+
+    def test_vector_arithmetic(self):
+        """Elementwise arithmetic of vectors matches the arithmetic of elements"""
+        F, test_vectors = self.set_up_field()
+        a = [test_vectors['a'], F(0), F(-1), F.random()]
+        b = [test_vectors['b'], F(5), F(1), F.random()]
+        u = F.vector(a)
+        v = F.vector(b)
+        self.assertEqual(len(u), 4)
+        self.assertEqual(u + v, [x + y for x, y in zip(a, b)])
+        self.assertEqual(u - v, [x - y for x, y in zip(a, b)])
+        self.assertEqual(u * v, [x * y for x, y in zip(a, b)])
+        self.assertEqual(-u, [-x for x in a])
+        self.assertEqual(u.square(), [x * x for x in a])
+        self.assertEqual(u * 3, [x * 3 for x in a])
+        self.assertEqual(2 - u, [2 - x for x in a])
+        self.assertEqual(u + test_vectors['b'], [x + test_vectors['b'] for x in a])
+        # an element given first is broadcast too
+        c = test_vectors['b']
+        self.assertEqual(F(3) * u, [3 * x for x in a])
+        self.assertEqual(c + u, [c + x for x in a])
+        self.assertEqual(c - u, [c - x for x in a])
+        self.assertEqual(u / v, [x / y for x, y in zip(a, b)])
+        self.assertEqual(u[0], test_vectors['a'])
+        self.assertEqual(u[1:3], [F(0), F(-1)])
+        self.assertEqual(list(u), a)
+        with self.assertRaises(ValueError):
+            u + F.vector([1, 2])
+
+    def test_vector_inverse_sqrt(self):
+        """Batch inversion and batch square root of a vector"""
+        F, test_vectors = self.set_up_field()
+        u = F.vector([test_vectors['a'], 0, test_vectors['b'], test_vectors['non_square']])
+        self.assertEqual(u.inverse(), F.batch_invert(list(u)))
+        roots, squares = u.sqrt()
+        self.assertEqual(squares, [False, True, True, False])
+        self.assertEqual(squares, u.is_square())
+        self.assertEqual(roots[1], 0)
+        self.assertEqual(roots[2], test_vectors['b'].sqrt())
+        self.assertEqual(roots[3], 0)
+
+    def test_vector_bytes(self):
+        """Bulk encoding of vectors round-trips through fixed-width records"""
+        F, test_vectors = self.set_up_field()
+        u = F.vector([test_vectors['a'], 0, -1, test_vectors['b']])
+        data = u.to_bytes()
+        self.assertEqual(len(data), 4 * F.byte_length)
+        self.assertEqual(bytes(data[:F.byte_length]), int(test_vectors['a'].value).to_bytes(F.byte_length, "little"))
+        self.assertEqual(F.vector_from_bytes(data), u)
+        out = bytearray(2 + 4 * F.byte_length)
+        u.to_bytes(out, offset=2)
+        self.assertEqual(F.vector_from_bytes(memoryview(out), offset=2), u)
+        self.assertEqual(F.vector_from_bytes(out, offset=2, n=2), u[:2])
+        with self.assertRaises(ValueError):
+            F.vector_from_bytes(data[1:])
+        with self.assertRaises(ValueError):
+            F.vector_from_bytes(b"\xff" * F.byte_length)
+        with self.assertRaises(ValueError):
+            u.to_bytes(bytearray(F.byte_length))
+
+    def test_backends(self):
+        """All the backends compute the same arithmetic"""
+        F, test_vectors = self.set_up_field()
+        a = test_vectors['a'].value
+        b = test_vectors['b'].value
+        for name in BACKENDS:
+            G = Field(F.p, backend=name)
+            self.assertEqual(G.backend.name, name)
+            self.assertEqual(G.two_adicity, F.two_adicity)
+            self.assertEqual(G.non_square, F.non_square)
+            self.assertEqual(G(a) * G(b), test_vectors['a_mul_b'])
+            self.assertEqual(G(a) + G(b), test_vectors['a_plus_b'])
+            self.assertEqual(G(a) / G(b), test_vectors['a_div_b'])
+            self.assertEqual(G(b).sqrt(), test_vectors['b'].sqrt())
+            self.assertEqual(G(a).is_square(), test_vectors['a'].is_square())
+            self.assertEqual(G.random().value.__class__, G.p.__class__)
+            with self.assertRaises(ZeroDivisionError):
+                G(a) / 0
+        with self.assertRaises(ValueError):
+            Field(F.p, backend="unknown")
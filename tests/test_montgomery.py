@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from src.curve.montgomery import Montgomery
 from src.field import Field
+from src.backend import BACKENDS
+from src import params
 import unittest
 from random import randint
 
@@ -26,6 +28,21 @@ class TestMontgomery(unittest.TestCase):
         E, test_vectors = self.set_up_curve()
         self.assertEqual(E.j_inv(), 8000)
 
+    def test_in_curve(self):
+        """Points are on the curve, and a point of the twist is not"""
+        E, test_vectors = self.set_up_curve()
+        for name in ['p', 'q', 'p_plus_q', 'φ_p', 'k_times_p']:
+            self.assertTrue(test_vectors[name].in_curve())
+            self.assertFalse(test_vectors[name].in_curve(twist=True))
+        p = test_vectors['p'].dbl()
+        self.assertTrue(p.in_curve())
+        x = E.field(1)
+        while not (x**3 + E.a*x**2 + x).is_square():  # b is a non-square
+            x += 1
+        self.assertFalse(E(x, 1).in_curve())
+        self.assertTrue(E(x, 1).in_curve(twist=True))
+        self.assertFalse(E(2*x, 2).in_curve())
+
     def test_cofactor(self):
         """h*p is of order r"""
         E, _ = self.set_up_curve()
@@ -33,11 +50,87 @@ class TestMontgomery(unittest.TestCase):
             p = E.random().naive_mul(E.h)
             self.assertTrue(p.is_prime_order(E.r))
 
+    def test_random_batch(self):
+        """Random points are on the curve and reproducible with a seed"""
+        E, test_vectors = self.set_up_curve()
+        points = E.random_batch(10, seed=1)
+        self.assertEqual(len(points), 10)
+        for p in points:
+            self.assertTrue(p.in_curve())
+        self.assertEqual([p.x for p in points], [p.x for p in E.random_batch(10, seed=1)])
+
+    def test_encode_decode_array(self):
+        """Bulk encoding of the affine x-coordinates round-trips"""
+        E, test_vectors = self.set_up_curve()
+        points = [test_vectors['p'], test_vectors['q'].dbl(), E.generator]
+        data = E.encode_array(points)
+        self.assertEqual(len(data), 3 * E.field.byte_length)
+        self.assertEqual(E.decode_array(data), points)
+        self.assertEqual(E.decode_array(E.encode_array([E(1, 0)])), [E(0, 1)])
+
+    def test_glv_edge_cases(self):
+        """GLV with scalars that are not reduced modulo r"""
+        E, test_vectors = self.set_up_curve()
+        p = test_vectors['p']
+        for k in [E.r, -E.r, E.r + 5, -1, 2 * E.r - 1, 2**256 - 1]:
+            self.assertEqual(p.glv(k), p.naive_mul(k % E.r))
+
+    def test_fixed_base_mul(self):
+        """Fixed-base multiplication of the generator"""
+        E, test_vectors = self.set_up_curve()
+        g = E.generator
+        k = test_vectors['k']
+        for scalar in [0, 1, 2, 3, k, E.r - 1, E.r]:
+            self.assertEqual(E.fixed_base_mul(scalar), g.naive_mul(scalar % E.r))
+        self.assertTrue(E._edwards_twin.generator.in_curve())
+
     def test_is_prime_order(self):
         """p is of prime order r"""
         E, test_vectors = self.set_up_curve()
         self.assertTrue(test_vectors['p'].is_prime_order(E.r))
 
+    def test_point_batch(self):
+        """The operations of `PointBatch` match those of `Point`"""
+        E, test_vectors = self.set_up_curve()
+        p, q, p_minus_q = test_vectors['p'], test_vectors['q'], test_vectors['p_minus_q']
+        points = [p, q.dbl(), E.generator, E(1, 0)]
+        batch = E.point_batch(points)
+        self.assertEqual(len(batch), 4)
+        self.assertEqual(list(batch), points)
+        self.assertEqual(list(batch.dbl()), [point.dbl() for point in points])
+        self.assertEqual(batch.neg(), batch)
+        self.assertEqual(list(batch.normalize()), E.batch_normalize(points))
+        self.assertEqual(batch.normalize(), batch)
+        self.assertEqual(bytes(batch.encode()), bytes(E.encode_array(points)))
+        sums = E.point_batch([p, q]).add(E.point_batch([q, p]), E.point_batch([p_minus_q, p_minus_q]))
+        self.assertEqual(list(sums), [test_vectors['p_plus_q']] * 2)
+        self.assertNotEqual(E.point_batch([p]), E.point_batch([q]))
+        with self.assertRaises(ValueError):
+            batch.add(batch, E.point_batch([p]))
+
+    def test_in_prime_subgroup(self):
+        """The endomorphism test agrees with the multiplication by r"""
+        E, test_vectors = self.set_up_curve()
+        points = E.random_batch(20, seed=0)
+        expected = [p.is_prime_order(E.r) for p in points]
+        self.assertEqual([p.in_prime_subgroup() for p in points], expected)
+        self.assertIn(False, expected)
+        self.assertIn(True, expected)
+        self.assertTrue(test_vectors['p'].in_prime_subgroup())
+        self.assertTrue(E(1, 0).in_prime_subgroup())
+        # the points of order 2: x = 0 and the roots of x² + ax + 1
+        root = (E.a**2 - 4).sqrt()
+        torsion = [E(0, 1), E((root - E.a)/2, 1), E((-root - E.a)/2, 1)]
+        self.assertEqual([p.in_prime_subgroup() for p in torsion], [False] * 3)
+        # points of order 4 of the twist
+        for p in [E(1, 1), E(-1, 1)]:
+            self.assertFalse(p.in_curve())
+            self.assertFalse(p.in_prime_subgroup())
+        twist = E(E.field.random(), 1)
+        while twist.in_curve():
+            twist = E(E.field.random(), 1)
+        self.assertFalse(twist.in_prime_subgroup())
+
     def test_φ_norm(self):
         """φ²(p) = [-2]p"""
         E, test_vectors = self.set_up_curve()
@@ -76,6 +169,31 @@ class TestMontgomery(unittest.TestCase):
         p_double = test_vectors['p'].dbl()
         self.assertEqual(p_double, test_vectors['p_double'])
 
+    def test_lazy_reduction(self):
+        """dbl and add with lazy reduction, and their number of reductions"""
+        E, test_vectors = self.set_up_curve()
+        E_lazy = Montgomery(E.a, E.b, E.r, E.h, lazy=True)
+        p = E_lazy(test_vectors['p'].x, test_vectors['p'].z)
+        q = E_lazy(test_vectors['q'].x, test_vectors['q'].z)
+        p_minus_q = E_lazy(test_vectors['p_minus_q'].x, test_vectors['p_minus_q'].z)
+        self.assertEqual(p.dbl(), test_vectors['p_double'])
+        self.assertEqual(p.add(q, p_minus_q), test_vectors['p_plus_q'])
+        self.assertEqual(p.glv(test_vectors['k']), test_vectors['k_times_p'])
+        for eager, lazy in p.reduction_counts(q, p_minus_q).values():
+            self.assertLess(lazy, eager)
+
+    def test_ladder_step(self):
+        """One step of the Montgomery ladder in every backend: (p, 2p) → (2p, 3p)"""
+        E, test_vectors = self.set_up_curve()
+        p = test_vectors['p']
+        p_double = test_vectors['p_double']
+        for backend in BACKENDS.values():
+            acc = backend.accumulators([p.x.value, p.z.value, p_double.x.value, p_double.z.value])
+            backend.ladder_step(acc, p.x.value, E.a24.value, E.field.p)
+            x2, z2, x3, z3 = backend.values(acc)
+            self.assertEqual(E(x2, z2), p_double)
+            self.assertEqual(E(x3, z3), p.naive_mul(3))
+
     def test_scalar_mul(self):
         """k*p from test vectors"""
         E, test_vectors = self.set_up_curve()
@@ -155,12 +273,89 @@ class TestMontgomery(unittest.TestCase):
     #     r = p.slow_add(q)
     #     self.assertEqual(r, test_vectors["p_plus_q"])
 
+    def test_batch_normalize(self):
+        """Batch normalization matches `normalize`, including the point at infinity"""
+        E, test_vectors = self.set_up_curve()
+        points = [test_vectors['p'].dbl(), test_vectors['q'], E(1, 0),
+                  test_vectors['p_plus_q'].dbl()]
+        normalized = E.batch_normalize(points)
+        for point, affine in zip(points, normalized):
+            self.assertEqual(affine.z, 1 if point.z != 0 else 0)
+            self.assertEqual(affine.x, point.normalize().x)
+
     def test_mul_rfc_7748(self):
         E, test_vectors = self.set_up_curve()
         k = 13  # test_vectors['k']
         k_times_p = test_vectors['p'].mul_rfc_7748(k)
         k_times_p_naive = test_vectors['p'].naive_mul(k)
         self.assertEqual(k_times_p, k_times_p_naive)
+        self.assertEqual(test_vectors['p'].mul_rfc_7748(test_vectors['k']), test_vectors['k_times_p'])
+        self.assertEqual(test_vectors['p'].dbl().mul_rfc_7748(-k), test_vectors['p'].dbl().naive_mul(k))
+        self.assertEqual(test_vectors['p'].mul_rfc_7748(E.r).z, 0)
+        self.assertEqual(test_vectors['p'].mul_rfc_7748(0).z, 0)
+        self.assertEqual(E(1, 0).mul_rfc_7748(k).z, 0)
+
+    def test_naive_mul(self):
+        """The ladder of `naive_mul` matches a chain of differential additions, and the points of order 2"""
+        E, test_vectors = self.set_up_curve()
+        p = test_vectors['p']
+        # multiples[k] = k*p, with (k+1)*p = k*p + p of difference (k-1)*p
+        multiples = [E(1, 0), p, p.dbl()]
+        for _ in range(10):
+            multiples.append(multiples[-1].add(p, multiples[-2]))
+        for k, k_times_p in enumerate(multiples):
+            self.assertEqual(p.naive_mul(k), k_times_p)
+            self.assertEqual(p.naive_mul(-k), k_times_p)
+        self.assertEqual(E(p.x * 3, p.z * 3).naive_mul(12), multiples[12])
+        root = (E.a**2 - 4).sqrt()
+        for q in [E(0, 1), E((root - E.a)/2, 1)]:
+            self.assertEqual([q.naive_mul(k).z == 0 for k in range(4)], [True, False, True, False])
+            self.assertEqual(q.naive_mul(3), q)
+
+    def test_ladder_values(self):
+        """The ladder on residues in every backend, and its conditional swap"""
+        E, test_vectors = self.set_up_curve()
+        p = test_vectors['p'].normalize()
+        k = test_vectors['k']
+        for name, backend in BACKENDS.items():
+            acc = backend.accumulators([1, 2, 3, 4])
+            backend.cswap(acc, 0)
+            self.assertEqual(backend.values(acc), (1, 2, 3, 4))
+            backend.cswap(acc, 1)
+            self.assertEqual(backend.values(acc), (3, 4, 1, 2))
+            curve = params.montgomery(name)
+            x2, z2, x3, z3 = curve._ladder_values(p.x.value, k, 256)
+            self.assertEqual(E(x2, z2), test_vectors['k_times_p'])
+            self.assertEqual(E(x3, z3), test_vectors['p'].naive_mul(k + 1))
+
+    def test_recover_y(self):
+        """The y-coordinate recovered after the ladder gives k*P on the Edwards model"""
+        E, test_vectors = self.set_up_curve()
+        edwards = E.edwards()
+        p = edwards.generator
+        k = test_vectors['k']
+        u = (p.z + p.y) / (p.z - p.y)
+        v = u / p.x * p.z
+        x1, z1, x2, z2 = E._ladder_values(u.value, k, 256)
+        x, y, z = E._recover_y_values(u.value, v.value, x1, z1, x2, z2)
+        self.assertEqual(E.b * y**2 * z, x * (x**2 + E.a * x * z + z**2))
+        q = p.naive_mul(k)
+        self.assertEqual(E(x, z), q.to_montgomery(E))
+        # x = u/v on the twin Edwards curve
+        self.assertEqual(E.field(x) * q.z, q.x * E.field(y))
+        self.assertEqual(E.generator.to_edwards().to_montgomery(E), E.generator)
+
+    def test_multi_scalar_mul_ladder(self):
+        """The two-dimensional ladder matches `multi_scalar_mul` for all the signs of the scalars"""
+        E, test_vectors = self.set_up_curve()
+        p, q, p_minus_q = test_vectors['p'], test_vectors['q'], test_vectors['p_minus_q']
+        for k1, k2 in [(test_vectors['k1'], test_vectors['k2']), (-7, 11), (7, -11), (-7, -11), (0, 5), (5, 0), (0, 0)]:
+            self.assertEqual(p.multi_scalar_mul_ladder(k1, q, k2, p_minus_q), p.multi_scalar_mul(k1, q, k2, p_minus_q))
+        # leading zero bits do not change the result
+        self.assertEqual(p.multi_scalar_mul_ladder(7, q, 11, p_minus_q, n_bits=128),
+                         p.multi_scalar_mul(7, q, 11, p_minus_q))
+        k = test_vectors['k']
+        self.assertEqual(p.glv(k, constant_time=True), test_vectors['k_times_p'])
 
     def test_constant_time_multi_scalar_mul(self):
         """k1*p + k2*q from test vectors using constant time"""
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import unittest
+from src import params
+from src.field import Field
+from src.backend import BACKENDS
+
+
+class TestParams(unittest.TestCase):
+
+    def test_field_constants(self):
+        """The precomputed constants are the computed ones"""
+        F = Field(params.P)
+        self.assertEqual(params.TWO_ADICITY, F.two_adicity)
+        self.assertEqual(params.NON_SQUARE, F.non_square)
+        G = params.field()
+        self.assertEqual(G.p, F.p)
+        self.assertEqual(G.non_square, F.non_square)
+        self.assertEqual(G(params.NON_SQUARE).sqrt(), None)
+
+    def set_up_vectors(self, name):
+        """Namespace of the test vectors file `tests/vectors/<name>.py`."""
+        scope = {}
+        with open("tests/vectors/{}.py".format(name), "r") as file:
+            exec(file.read(), scope)
+        return scope
+
+    def test_edwards(self):
+        """The registry Edwards curve matches the test vectors"""
+        E = params.edwards()
+        vectors = self.set_up_vectors("edwards")
+        self.assertEqual((E.a, E.d, E.r, E.h), (vectors['a'], vectors['d'], vectors['r'], vectors['h']))
+        self.assertEqual(E.generator.encode_base(256), vectors['E'].generator.encode_base(256))
+        self.assertTrue(E.generator.is_prime_order(E.r))
+
+    def test_montgomery(self):
+        """The registry Montgomery curve matches the test vectors"""
+        E = params.montgomery()
+        vectors = self.set_up_vectors("montgomery")
+        self.assertEqual((E.a, E.b, E.r, E.h), (vectors['a'], vectors['b'], vectors['r'], vectors['h']))
+        self.assertTrue(E.generator.in_curve())
+        self.assertTrue(E.generator.is_prime_order(E.r))
+
+    def test_memoized(self):
+        """The curves are built once per backend and options"""
+        self.assertIs(params.edwards(), params.edwards())
+        self.assertIs(params.montgomery().field, params.edwards().field)
+        self.assertIsNot(params.edwards(lazy=True), params.edwards())
+        self.assertTrue(params.edwards(lazy=True).lazy)
+        for name in BACKENDS:
+            self.assertEqual(params.field(name).backend.name, name)
+            self.assertIs(params.field(name), params.field(BACKENDS[name]))
+            self.assertEqual(params.edwards(name).generator.encode_base(256),
+                             params.edwards().generator.encode_base(256))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import unittest
+from random import randint
+from src.recoding import wnaf, joint_wnaf, weight, signed_windows
+
+
+class TestRecoding(unittest.TestCase):
+
+    def test_wnaf(self):
+        """wNAF digits are odd, bounded, non-adjacent and sum to the scalar"""
+        for width in range(2, 8):
+            for k in [0, 1, -1, 2**127, -2**253 + 1] + [randint(-2**253, 2**253) for _ in range(50)]:
+                digits = wnaf(k, width)
+                self.assertEqual(sum(d << i for i, d in enumerate(digits)), k)
+                for i, d in enumerate(digits):
+                    if d != 0:
+                        self.assertEqual(d % 2, 1)
+                        self.assertLess(abs(d), 2**(width-1))
+                        self.assertEqual(weight(digits[i+1:i+width]), 0)
+        self.assertEqual(wnaf(7, 2), [-1, 0, 0, 1])
+        with self.assertRaises(ValueError):
+            wnaf(7, 1)
+
+    def test_joint_wnaf(self):
+        """Columns of the joint wNAF are the digits of each scalar"""
+        scalars = [randint(0, 2**127), randint(-2**60, 0), 0]
+        columns = joint_wnaf(scalars, 4)
+        for i, k in enumerate(scalars):
+            self.assertEqual(sum(column[i] << j for j, column in enumerate(columns)), k)
+        self.assertEqual(joint_wnaf([0, 0], 4), [])
+
+    def test_signed_windows(self):
+        """Signed window digits are bounded and sum to the scalar"""
+        for width in range(1, 9):
+            for k in [0, 1, 2**253 - 1] + [randint(0, 2**253) for _ in range(50)]:
+                digits = signed_windows(k, width)
+                self.assertEqual(sum(d << (i*width) for i, d in enumerate(digits)), k)
+                for d in digits:
+                    self.assertTrue(-2**(width-1) < d <= 2**(width-1))